@@ -0,0 +1,126 @@
+"""
+Shared response cache for the analytics endpoints.
+
+Admin dashboards poll every chart endpoint, and several admins opening the
+dashboard at once would otherwise run the same heavy aggregates in parallel.
+`cached_analytics` wraps an APIView `get` method so that:
+
+- Responses are cached per endpoint and normalized query parameters
+  (for example `days` and `limit`), shared by every user.
+- Within `soft_ttl` seconds the cached data is served as is.
+- After `soft_ttl`, exactly one request (the holder of a cache.add() lock)
+  recomputes the data while concurrent requests keep getting the stale copy
+  until `hard_ttl` expires (stale-while-revalidate).
+- On a cold key, requests that lose the lock wait up to `wait_timeout`
+  seconds for the winner instead of running the same query
+  (single-flight). If the result is not ready by then they get a 503 with
+  Retry-After, so a slow aggregate never ties up more than one worker for
+  its whole duration.
+
+Every response carries `cache` metadata with the age of the data in seconds
+and whether it was a hit, miss or stale; the age is also sent as an `Age`
+header.
+
+The lock only coordinates workers that share a cache backend, so configure
+a shared cache (Redis/Memcached) in production; the default LocMemCache is
+per process.
+"""
+import functools
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _normalize(value):
+    """Treat `30`, `030` and ` 30 ` as the same parameter value."""
+    value = (value or '').strip()
+    try:
+        return str(int(value))
+    except ValueError:
+        return value.lower()
+
+
+def make_cache_key(view, request, params):
+    endpoint = f'{view.__class__.__module__}.{view.__class__.__name__}'
+    query = '&'.join(
+        f'{name}={_normalize(request.query_params.get(name))}' for name in params
+    )
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()
+    return f'analytics:{endpoint}:{digest}'
+
+
+def _respond(entry, cache_status):
+    age = max(0, int(time.time() - entry['computed_at']))
+    data = dict(entry['data'])
+    data['cache'] = {'status': cache_status, 'age': age}
+    response = Response(data)
+    response['Age'] = str(age)
+    return response
+
+
+def cached_analytics(params=('days', 'limit'), soft_ttl=60, hard_ttl=600,
+                     lock_timeout=30, wait_timeout=1.0, poll_interval=0.05,
+                     retry_after=2):
+    """
+    Cache an analytics APIView `get` method with single-flight refresh.
+
+    Args:
+        params: Query parameters that change the response
+        soft_ttl: Seconds before cached data is refreshed
+        hard_ttl: Seconds before cached data is dropped entirely
+        lock_timeout: Seconds before an abandoned refresh lock expires
+        wait_timeout: Seconds a request waits for another worker's result
+        poll_interval: Seconds between cache checks while waiting
+        retry_after: Retry-After seconds sent when the wait times out
+    """
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            key = make_cache_key(self, request, params)
+            lock_key = f'{key}:lock'
+
+            entry = cache.get(key)
+            if entry is not None and time.time() - entry['computed_at'] < soft_ttl:
+                return _respond(entry, 'hit')
+
+            locked = cache.add(lock_key, 1, lock_timeout)
+            if not locked:
+                # Another worker is computing this key
+                if entry is not None:
+                    return _respond(entry, 'stale')
+
+                deadline = time.monotonic() + wait_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(poll_interval)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        return _respond(entry, 'hit')
+                # Still computing: ask the client to come back rather than
+                # blocking this worker or running the query a second time
+                response = Response(
+                    {'error': 'Analytics are being computed, retry shortly'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
+
+            try:
+                response = get(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    # Keep serving the previous data rather than caching an error
+                    if entry is not None:
+                        return _respond(entry, 'stale')
+                    return response
+
+                entry = {'data': response.data, 'computed_at': time.time()}
+                cache.set(key, entry, hard_ttl)
+                return _respond(entry, 'miss')
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+
+        return wrapper
+    return decorator
@@ -1,3 +1,44 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyMetric(models.Model):
+    """
+    Pre-aggregated daily value for one analytics metric.
+
+    The admin dashboard reads its time series from this table instead of
+    grouping raw Order, User and Enrollment rows on every request. Rows
+    are written by analytics.rollups.refresh_rollups() (see the
+    refresh_analytics_rollups management command).
+
+    `dimension` splits a metric further (for example by course); the empty
+    string holds the total for the day.
+    """
+
+    class Metric(models.TextChoices):
+        REVENUE = 'revenue', 'Revenue'
+        ORDERS = 'orders', 'Completed orders'
+        SIGNUPS = 'signups', 'New users'
+        ENROLLMENTS = 'enrollments', 'Enrollments'
+        COMPLETED_ENROLLMENTS = 'completed_enrollments', 'Completed enrollments'
+
+    TOTAL = ''
+
+    date = models.DateField()
+    metric = models.CharField(max_length=50, choices=Metric.choices)
+    dimension = models.CharField(max_length=100, blank=True, default=TOTAL)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            # Column order matches the dashboard range scan:
+            # WHERE metric IN (...) AND dimension = '' AND date BETWEEN ...
+            models.UniqueConstraint(
+                fields=['metric', 'dimension', 'date'],
+                name='analytics_dailymetric_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.date} {self.metric}{"/" + self.dimension if self.dimension else ""}: {self.value}'
@@ -0,0 +1,128 @@
+"""
+Daily rollups for the analytics dashboard.
+
+Each metric is computed with one grouped aggregate over the refreshed date
+range and upserted into DailyMetric, one row per day (days without activity
+are stored as zero so the series is dense). Refreshing a range is idempotent,
+so the same days can be recomputed as often as needed.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from enrollments.models import Enrollment
+from orders.models import Order
+
+from .models import DailyMetric
+
+User = get_user_model()
+
+Metric = DailyMetric.Metric
+
+
+def _day_bounds(start_date, end_date):
+    """Aware datetimes covering [start_date, end_date] in the current timezone."""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _group_by_day(queryset, date_field, **aggregates):
+    """Run one GROUP BY day query and return {date: {name: value}}."""
+    rows = queryset.annotate(
+        day=TruncDate(date_field)
+    ).values('day').annotate(**aggregates).order_by()
+    return {row.pop('day'): row for row in rows}
+
+
+def compute_daily_metrics(start_date, end_date):
+    """
+    Aggregate every metric per day for the given inclusive date range.
+
+    Returns:
+        Dict of (date, metric) -> value
+    """
+    start, end = _day_bounds(start_date, end_date)
+
+    orders = _group_by_day(
+        Order.objects.filter(status='completed', created_at__gte=start, created_at__lt=end),
+        'created_at',
+        revenue=Sum('total_amount'),
+        orders=Count('id'),
+    )
+    signups = _group_by_day(
+        User.objects.filter(date_joined__gte=start, date_joined__lt=end),
+        'date_joined',
+        signups=Count('id'),
+    )
+    enrollments = _group_by_day(
+        Enrollment.objects.filter(enrolled_at__gte=start, enrolled_at__lt=end),
+        'enrolled_at',
+        enrollments=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+
+    values = {}
+    day = start_date
+    while day <= end_date:
+        order_row = orders.get(day, {})
+        enrollment_row = enrollments.get(day, {})
+        values[(day, Metric.REVENUE)] = order_row.get('revenue') or 0
+        values[(day, Metric.ORDERS)] = order_row.get('orders') or 0
+        values[(day, Metric.SIGNUPS)] = signups.get(day, {}).get('signups') or 0
+        values[(day, Metric.ENROLLMENTS)] = enrollment_row.get('enrollments') or 0
+        values[(day, Metric.COMPLETED_ENROLLMENTS)] = enrollment_row.get('completed') or 0
+        day += timedelta(days=1)
+    return values
+
+
+def refresh_rollups(start_date, end_date, batch_size=1000):
+    """
+    Recompute and upsert DailyMetric rows for an inclusive date range.
+
+    Returns:
+        Number of rows written
+    """
+    values = compute_daily_metrics(start_date, end_date)
+    now = timezone.now()
+    rows = [
+        DailyMetric(
+            date=day,
+            metric=metric,
+            dimension=DailyMetric.TOTAL,
+            value=value,
+            updated_at=now,
+        )
+        for (day, metric), value in values.items()
+    ]
+    DailyMetric.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['metric', 'dimension', 'date'],
+        update_fields=['value', 'updated_at'],
+    )
+    return len(rows)
+
+
+def read_daily_metrics(metrics, start_date, end_date):
+    """
+    Read rolled-up totals for several metrics in one indexed range scan.
+
+    Returns:
+        Dict of metric -> {date: float}
+    """
+    series = {metric: {} for metric in metrics}
+    rows = DailyMetric.objects.filter(
+        metric__in=metrics,
+        dimension=DailyMetric.TOTAL,
+        date__gte=start_date,
+        date__lte=end_date,
+    ).values_list('date', 'metric', 'value')
+    for day, metric, value in rows:
+        series[metric][day] = float(value)
+    return series
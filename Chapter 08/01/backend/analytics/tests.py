@@ -1,3 +1,223 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from .caching import cached_analytics, make_cache_key
+from .models import DailyMetric
+from .rollups import refresh_rollups
+from .views import RevenueAnalyticsView
+
+User = get_user_model()
+
+Metric = DailyMetric.Metric
+
+
+class RollupRefreshTests(TestCase):
+    """refresh_rollups() writes a dense, idempotent daily series."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=2)
+
+    def join(self, email, day):
+        user = User.objects.create_user(email=email, password='pass1234', name=email)
+        joined = timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=12)
+        User.objects.filter(pk=user.pk).update(date_joined=joined)
+
+    def signups(self):
+        return dict(
+            DailyMetric.objects.filter(
+                metric=Metric.SIGNUPS, dimension=DailyMetric.TOTAL
+            ).values_list('date', 'value')
+        )
+
+    def test_days_without_activity_are_stored_as_zero(self):
+        self.join('a@example.com', self.start)
+        self.join('b@example.com', self.start)
+
+        written = refresh_rollups(self.start, self.today)
+
+        self.assertEqual(written, 3 * len(Metric.values))
+        self.assertEqual(self.signups(), {
+            self.start: Decimal('2'),
+            self.start + timedelta(days=1): Decimal('0'),
+            self.today: Decimal('0'),
+        })
+
+    def test_refresh_is_idempotent_and_updates_in_place(self):
+        self.join('a@example.com', self.today)
+        refresh_rollups(self.start, self.today)
+
+        self.join('b@example.com', self.today)
+        refresh_rollups(self.start, self.today)
+
+        self.assertEqual(self.signups()[self.today], Decimal('2'))
+        self.assertEqual(
+            DailyMetric.objects.filter(metric=Metric.SIGNUPS).count(), 3
+        )
+
+
+class RevenueAnalyticsTests(TestCase):
+    """The revenue chart is one conditional aggregate over DailyMetric."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='admin@example.com', password='pass1234', name='Admin'
+        )
+        self.today = timezone.now().date()
+
+    def add(self, days_ago, metric, value):
+        DailyMetric.objects.create(
+            date=self.today - timedelta(days=days_ago), metric=metric, value=value
+        )
+
+    def get(self, **params):
+        request = APIRequestFactory().get('/api/analytics/revenue/', params)
+        force_authenticate(request, user=self.user)
+        return RevenueAnalyticsView.as_view()(request)
+
+    def test_current_and_previous_period_totals(self):
+        self.add(0, Metric.REVENUE, 100)
+        self.add(0, Metric.ORDERS, 2)
+        self.add(3, Metric.REVENUE, 50)
+        self.add(3, Metric.ORDERS, 1)
+        # Previous 7-day period
+        self.add(10, Metric.REVENUE, 75)
+        self.add(10, Metric.ORDERS, 5)
+
+        response = self.get(days='7')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['labels']), 8)
+        self.assertEqual(response.data['values'][-1], 100.0)
+        self.assertEqual(response.data['stats'], {
+            'total': '150.00',
+            'growth': 100.0,
+            'averageOrder': '50.00',
+            'orderCount': 3,
+        })
+
+    def test_granularity_groups_into_buckets(self):
+        self.add(0, Metric.REVENUE, 10)
+        self.add(1, Metric.REVENUE, 20)
+        self.add(40, Metric.REVENUE, 30)
+
+        month = self.get(days='60', granularity='month')
+        week = self.get(days='60', granularity='week')
+
+        self.assertEqual(month.data['labels'][-1], self.today.strftime('%Y-%m'))
+        self.assertTrue(all(len(label) == 7 for label in month.data['labels']))
+        self.assertEqual(sum(month.data['values']), 60.0)
+        self.assertEqual(sum(week.data['values']), 60.0)
+
+        monday = self.today - timedelta(days=self.today.weekday())
+        self.assertEqual(week.data['labels'][-1], monday.strftime('%Y-%m-%d'))
+
+    def test_invalid_granularity(self):
+        response = self.get(granularity='hour')
+        self.assertEqual(response.status_code, 400)
+
+
+class CountingView(APIView):
+    """Cached view that counts how often its data is computed."""
+
+    calls = 0
+    delay = 0
+
+    @cached_analytics(params=('days',), soft_ttl=60, wait_timeout=2.0, poll_interval=0.01)
+    def get(self, request):
+        type(self).calls += 1
+        time.sleep(self.delay)
+        return Response({'calls': type(self).calls})
+
+
+class QuickGiveUpView(APIView):
+    """Cached view whose waiters give up almost immediately."""
+
+    @cached_analytics(params=('days',), wait_timeout=0.05, poll_interval=0.01)
+    def get(self, request):
+        CountingView.calls += 1
+        return Response({})
+
+
+class CachedAnalyticsTests(SimpleTestCase):
+    """Single-flight refresh and stale-while-revalidate of cached_analytics."""
+
+    def setUp(self):
+        cache.clear()
+        CountingView.calls = 0
+        CountingView.delay = 0
+
+    def get(self, view_class=CountingView):
+        return view_class.as_view()(APIRequestFactory().get('/', {'days': '30'}))
+
+    def key(self, view_class=CountingView):
+        request = Request(APIRequestFactory().get('/', {'days': '30'}))
+        return make_cache_key(view_class(), request, ('days',))
+
+    def test_concurrent_cold_requests_compute_once(self):
+        CountingView.delay = 0.2
+        barrier = threading.Barrier(5)
+        responses = []
+
+        def request():
+            barrier.wait()
+            responses.append(self.get())
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CountingView.calls, 1)
+        self.assertEqual([r.status_code for r in responses], [200] * 5)
+        self.assertEqual(
+            sorted(r.data['cache']['status'] for r in responses),
+            ['hit', 'hit', 'hit', 'hit', 'miss']
+        )
+
+    def test_waiter_gets_stale_value_while_another_refreshes(self):
+        key = self.key()
+        cache.set(key, {'data': {'calls': 0}, 'computed_at': time.time() - 120}, 600)
+        # Another worker holds the refresh lock
+        cache.add(f'{key}:lock', 1, 30)
+
+        response = self.get()
+
+        self.assertEqual(CountingView.calls, 0)
+        self.assertEqual(response.data['cache']['status'], 'stale')
+        self.assertEqual(response.data['calls'], 0)
+        self.assertGreaterEqual(int(response['Age']), 120)
+
+    def test_cold_waiter_gives_up_with_retry_after(self):
+        cache.add(f'{self.key(QuickGiveUpView)}:lock', 1, 30)
+
+        started = time.monotonic()
+        response = self.get(QuickGiveUpView)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(CountingView.calls, 0)
+
+    def test_expired_entry_is_refreshed_by_lock_holder(self):
+        key = self.key()
+        cache.set(key, {'data': {'calls': 0}, 'computed_at': time.time() - 120}, 600)
+
+        response = self.get()
+
+        self.assertEqual(CountingView.calls, 1)
+        self.assertEqual(response.data['cache']['status'], 'miss')
+        self.assertEqual(cache.get(key)['data'], {'calls': 1})
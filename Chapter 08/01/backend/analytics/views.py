@@ -1,5 +1,5 @@
-from django.db.models import Sum, Count, Avg, Q
-from django.db.models.functions import TruncDate
+from django.db.models import Sum, Count, Avg, Q, F, DateField
+from django.db.models.functions import TruncWeek, TruncMonth
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.views import APIView
@@ -7,67 +7,129 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 
-from orders.models import Order, OrderItem
+from orders.models import OrderItem
 from enrollments.models import Enrollment
 from reviews.models import Review
 from courses.models import Course, Category
 from django.contrib.auth import get_user_model
 
+from .caching import cached_analytics
+from .models import DailyMetric
+from .rollups import read_daily_metrics
+
 User = get_user_model()
 
+Metric = DailyMetric.Metric
+
+
+def _dense_series(values_by_date, start_date, end_date):
+    """Expand {date: value} into chart labels/values with zeros for gaps."""
+    labels = []
+    values = []
+    current_date = start_date
+    while current_date <= end_date:
+        labels.append(current_date.strftime('%Y-%m-%d'))
+        values.append(values_by_date.get(current_date, 0))
+        current_date += timedelta(days=1)
+    return labels, values
+
+
+GRANULARITY_TRUNC = {
+    'day': lambda field: F(field),
+    'week': lambda field: TruncWeek(field, output_field=DateField()),
+    'month': lambda field: TruncMonth(field, output_field=DateField()),
+}
+
+
+def _bucket_starts(start_date, end_date, granularity):
+    """First day of every day/week/month bucket overlapping the range."""
+    if granularity == 'week':
+        current = start_date - timedelta(days=start_date.weekday())
+    elif granularity == 'month':
+        current = start_date.replace(day=1)
+    else:
+        current = start_date
+
+    buckets = []
+    while current <= end_date:
+        buckets.append(current)
+        if granularity == 'week':
+            current += timedelta(days=7)
+        elif granularity == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+    return buckets
+
+
 class RevenueAnalyticsView(APIView):
+    """
+    Revenue chart read from the DailyMetric rollup table.
+
+    One conditional aggregate over [previous_start, end_date] returns the
+    current series, the current totals and the previous-period revenue:
+
+        SELECT bucket,
+               SUM(value) FILTER (WHERE metric = 'revenue' AND date >= start),
+               SUM(value) FILTER (WHERE metric = 'orders' AND date >= start),
+               SUM(value) FILTER (WHERE metric = 'revenue' AND date < start)
+        ... GROUP BY bucket
+
+    ?granularity=day|week|month groups the series into fewer points.
+    """
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=('days', 'granularity'))
     def get(self, request):
         try:
             days = min(int(request.GET.get('days', 30)), 365)  
-            end_date = timezone.now()
+            granularity = request.GET.get('granularity', 'day')
+            if granularity not in GRANULARITY_TRUNC:
+                return Response(
+                    {'error': 'granularity must be one of: day, week, month'},
+                    status=400
+                )
+
+            end_date = timezone.now().date()
             start_date = end_date - timedelta(days=days)
+            previous_start = start_date - timedelta(days=days)
 
-          
-            daily_revenue = Order.objects.filter(
-                status='completed',
-                created_at__gte=start_date,
-                created_at__lte=end_date
+            current = Q(date__gte=start_date)
+            buckets = DailyMetric.objects.filter(
+                metric__in=[Metric.REVENUE, Metric.ORDERS],
+                dimension=DailyMetric.TOTAL,
+                date__gte=previous_start,
+                date__lte=end_date
             ).annotate(
-                date=TruncDate('created_at')
-            ).values('date').annotate(
-                daily_total=Sum('total_amount'),
-                order_count=Count('id')
-            ).order_by('date')
-
-           
+                bucket=GRANULARITY_TRUNC[granularity]('date')
+            ).values('bucket').annotate(
+                revenue=Sum('value', filter=current & Q(metric=Metric.REVENUE)),
+                orders=Sum('value', filter=current & Q(metric=Metric.ORDERS)),
+                previous_revenue=Sum('value', filter=~current & Q(metric=Metric.REVENUE))
+            ).order_by('bucket')
+
+            revenue_by_bucket = {}
+            total_orders = 0
+            previous_revenue = 0.0
+            for row in buckets:
+                revenue_by_bucket[row['bucket']] = float(row['revenue'] or 0)
+                total_orders += int(row['orders'] or 0)
+                previous_revenue += float(row['previous_revenue'] or 0)
+
+            label_format = '%Y-%m' if granularity == 'month' else '%Y-%m-%d'
             labels = []
             values = []
-            current_date = start_date.date()
-            revenue_dict = {item['date']: float(item['daily_total']) for item in daily_revenue}
-
-            while current_date <= end_date.date():
-                labels.append(current_date.strftime('%Y-%m-%d'))
-                values.append(revenue_dict.get(current_date, 0))
-                current_date += timedelta(days=1)
+            for bucket in _bucket_starts(start_date, end_date, granularity):
+                labels.append(bucket.strftime(label_format))
+                values.append(revenue_by_bucket.get(bucket, 0))
 
-         
             total_revenue = sum(values)
-            total_orders = Order.objects.filter(
-                status='completed',
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).count()
-
-            
-            previous_start = start_date - timedelta(days=days)
-            previous_revenue = Order.objects.filter(
-                status='completed',
-                created_at__gte=previous_start,
-                created_at__lt=start_date
-            ).aggregate(total=Sum('total_amount'))['total'] or 0
-
-            growth = ((total_revenue - float(previous_revenue)) / float(previous_revenue) * 100) if previous_revenue > 0 else 0
+            growth = ((total_revenue - previous_revenue) / previous_revenue * 100) if previous_revenue > 0 else 0
 
             return Response({
                 'labels': labels,
                 'values': values,
+                'granularity': granularity,
                 'stats': {
                     'total': f"{total_revenue:.2f}",
                     'growth': round(growth, 1),
@@ -80,44 +142,32 @@ class RevenueAnalyticsView(APIView):
             return Response({'error': str(e)}, status=500)
 
 class StudentAnalyticsView(APIView):
+    """New users chart read from the DailyMetric rollup table."""
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=('days',))
     def get(self, request):
         try:
             days = min(int(request.GET.get('days', 60)), 365)
             end_date = timezone.now()
             start_date = end_date - timedelta(days=days)
+            previous_start = start_date - timedelta(days=days)
 
-          
-            daily_students = User.objects.filter(
-                date_joined__gte=start_date,
-                date_joined__lte=end_date
-            ).annotate(
-                date=TruncDate('date_joined')
-            ).values('date').annotate(
-                student_count=Count('id')
-            ).order_by('date')
-
-   
-            values = []
-            current_date = start_date.date()
-            students_dict = {item['date']: item['student_count'] for item in daily_students}
+            signups = read_daily_metrics(
+                [Metric.SIGNUPS],
+                previous_start.date(),
+                end_date.date()
+            )[Metric.SIGNUPS]
 
-            while current_date <= end_date.date():
-                labels.append(current_date.strftime('%Y-%m-%d'))
-                values.append(students_dict.get(current_date, 0))
-                current_date += timedelta(days=1)
+            labels, values = _dense_series(signups, start_date.date(), end_date.date())
+            values = [int(value) for value in values]
 
-         
             total_new_students = sum(values)
             total_active_students = User.objects.filter(is_active=True).count()
 
-        
-            previous_start = start_date - timedelta(days=days)
-            previous_students = User.objects.filter(
-                date_joined__gte=previous_start,
-                date_joined__lt=start_date
-            ).count()
+            previous_students = int(sum(
+                count for day, count in signups.items() if day < start_date.date()
+            ))
 
             growth = ((total_new_students - previous_students) / previous_students * 100) if previous_students > 0 else 0
 
@@ -135,40 +185,29 @@ class StudentAnalyticsView(APIView):
             return Response({'error': str(e)}, status=500)
 
 class CourseAnalyticsView(APIView):
+    """Enrollment chart read from the DailyMetric rollup table."""
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=('days',))
     def get(self, request):
         try:
             days = min(int(request.GET.get('days', 90)), 365)
             end_date = timezone.now()
             start_date = end_date - timedelta(days=days)
 
-            daily_enrollments = Enrollment.objects.filter(
-                enrolled_at__gte=start_date,
-                enrolled_at__lte=end_date
-            ).annotate(
-                date=TruncDate('enrolled_at')
-            ).values('date').annotate(
-                enrollment_count=Count('id')
-            ).order_by('date')
-
-           
-            labels = []
-            values = []
-            current_date = start_date.date()
-            enrollments_dict = {item['date']: item['enrollment_count'] for item in daily_enrollments}
+            series = read_daily_metrics(
+                [Metric.ENROLLMENTS, Metric.COMPLETED_ENROLLMENTS],
+                start_date.date(),
+                end_date.date()
+            )
 
-            while current_date <= end_date.date():
-                labels.append(current_date.strftime('%Y-%m-%d'))
-                values.append(enrollments_dict.get(current_date, 0))
-                current_date += timedelta(days=1)
+            labels, values = _dense_series(
+                series[Metric.ENROLLMENTS], start_date.date(), end_date.date()
+            )
+            values = [int(value) for value in values]
 
             total_enrollments = sum(values)
-            completed_enrollments = Enrollment.objects.filter(
-                enrolled_at__gte=start_date,
-                enrolled_at__lte=end_date,
-                status='completed'
-            ).count()
+            completed_enrollments = int(sum(series[Metric.COMPLETED_ENROLLMENTS].values()))
 
             completion_rate = (completed_enrollments / total_enrollments * 100) if total_enrollments > 0 else 0
             total_courses = Course.objects.filter(is_published=True).count()
@@ -189,6 +228,7 @@ class CourseAnalyticsView(APIView):
 class CompletionBreakdownView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=('days',))
     def get(self, request):
         try:
             days = min(int(request.GET.get('days', 120)), 365)
@@ -221,6 +261,7 @@ class CompletionBreakdownView(APIView):
 class TopCoursesView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=('limit',))
     def get(self, request):
         try:
             limit = min(int(request.GET.get('limit', 10)), 50)
@@ -254,6 +295,7 @@ class TopCoursesView(APIView):
 class CategoryDistributionView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_analytics(params=())
     def get(self, request):
         try:
             
@@ -0,0 +1,166 @@
+"""
+Negotiated frame encodings for websocket consumers.
+
+JSON stays the default. A client that lists the `datapundits.msgpack.v1`
+subprotocol in `Sec-WebSocket-Protocol` gets binary MessagePack frames
+instead, with key interning: keys from FRAME_KEYS are sent as their index
+in that table (a one-byte integer) rather than a repeated string. Keys not
+in the table are sent as strings, so new fields never break old clients.
+
+Interning walks the frame in Python, so it trades encode time for bytes.
+`datapundits.msgpack-plain.v1` skips it: full-size keys, but the cheapest
+encode. The client's first supported subprotocol wins; see
+load_tests/frame_codec_benchmark.py for the numbers.
+
+FRAME_KEYS is part of the protocol; only ever append to it. A different
+table needs a new subprotocol version.
+
+Clients on the msgpack subprotocol may send binary frames too; they are
+decoded and handed to the consumer as JSON text, so `receive()` handlers
+stay encoding-agnostic.
+
+msgpack is optional: without it the subprotocol is simply not offered.
+"""
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_SUBPROTOCOL = 'datapundits.msgpack.v1'
+MSGPACK_PLAIN_SUBPROTOCOL = 'datapundits.msgpack-plain.v1'
+
+FRAME_KEYS = (
+    # Envelope
+    'type', 'payload', 'message', 'success', 'count', 'error',
+    # Dashboard snapshot protocol
+    'version', 'base_version', 'ops', 'op', 'path', 'value',
+    'enrolled_courses_count', 'pending_notifications_count',
+    'pending_notifications', 'recent_enrollments', 'course_completion_stats',
+    'user_info', 'timestamp', 'id', 'username', 'email', 'is_instructor',
+    'course_id', 'course_name', 'status', 'enrolled_date', 'created_at',
+    'total_enrolled', 'in_progress', 'completed',
+    # Notifications
+    'notification', 'notifications', 'notification_id', 'notification_ids',
+    'unread_count',
+)
+
+
+class JSONCodec:
+    binary = False
+
+    def encode(self, frame):
+        return json.dumps(frame)
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack, with interned keys when a key table is given."""
+
+    binary = True
+
+    def __init__(self, keys=None):
+        self.keys = tuple(keys) if keys else None
+        self.key_ids = {key: index for index, key in enumerate(self.keys or ())}
+        self.packer = msgpack.Packer(use_bin_type=True)
+
+    def _intern(self, value):
+        # Hot path on the event loop: exact type checks, and scalars are
+        # never passed through a call
+        key_ids = self.key_ids
+        if type(value) is dict:
+            return {
+                key_ids.get(key, key): (
+                    self._intern(item) if type(item) in (dict, list) else item
+                )
+                for key, item in value.items()
+            }
+        if type(value) is list:
+            return [
+                self._intern(item) if type(item) in (dict, list) else item
+                for item in value
+            ]
+        return value
+
+    def _extern(self, value):
+        keys = self.keys
+        if type(value) is dict:
+            return {
+                keys[key] if type(key) is int else key: self._extern(item)
+                for key, item in value.items()
+            }
+        if type(value) is list:
+            return [self._extern(item) for item in value]
+        return value
+
+    def encode(self, frame):
+        if self.keys:
+            frame = self._intern(frame)
+        return self.packer.pack(frame)
+
+    def decode(self, data):
+        frame = msgpack.unpackb(data, raw=False, strict_map_key=False)
+        if self.keys:
+            frame = self._extern(frame)
+        return frame
+
+
+json_codec = JSONCodec()
+
+SUBPROTOCOL_CODECS = {}
+if msgpack is not None:
+    SUBPROTOCOL_CODECS[MSGPACK_SUBPROTOCOL] = MsgpackCodec(keys=FRAME_KEYS)
+    SUBPROTOCOL_CODECS[MSGPACK_PLAIN_SUBPROTOCOL] = MsgpackCodec()
+
+
+def negotiate(subprotocols):
+    """Return (subprotocol, codec) for the client's offered subprotocols."""
+    for subprotocol in subprotocols or ():
+        codec = SUBPROTOCOL_CODECS.get(subprotocol)
+        if codec is not None:
+            return subprotocol, codec
+    return None, json_codec
+
+
+class FrameCodecMixin:
+    """
+    Send and receive frames in the encoding negotiated at connect time.
+
+    Consumers send dicts with `send_frame()` instead of
+    `send(text_data=json.dumps(...))` or `send_json()`.
+    """
+
+    @property
+    def codec(self):
+        codec = getattr(self, '_codec', None)
+        if codec is None:
+            _, codec = negotiate(self.scope.get('subprotocols'))
+            self._codec = codec
+        return codec
+
+    async def accept(self, subprotocol=None, *args, **kwargs):
+        negotiated, self._codec = negotiate(self.scope.get('subprotocols'))
+        await super().accept(subprotocol or negotiated, *args, **kwargs)
+
+    async def send_frame(self, frame, close=False):
+        codec = self.codec
+        if codec.binary:
+            await self.send(bytes_data=codec.encode(frame), close=close)
+        else:
+            await self.send(text_data=codec.encode(frame), close=close)
+
+    async def send_json(self, content, close=False):
+        await self.send_frame(content, close=close)
+
+    async def websocket_receive(self, message):
+        data = message.get('bytes')
+        if data is not None and self.codec.binary:
+            try:
+                text = json.dumps(self.codec.decode(data))
+            except Exception:
+                return
+            message = {'type': message['type'], 'text': text}
+        await super().websocket_receive(message)
@@ -9,11 +9,18 @@ from enrollments.models import Enrollment
 from courses.models import Course
 from django.db import transaction
 
+from .codecs import FrameCodecMixin
+from .groups import group_add_many, group_discard_many
+from .heartbeat import HeartbeatMixin
+from .outbound import OutboundQueueMixin
+from .read import MAX_MARK_READ_BATCH, mark_read
+from .unread import get_unread_count
+
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(OutboundQueueMixin, FrameCodecMixin, HeartbeatMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.user = None
         self.user_group_name = None
@@ -37,30 +44,28 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.user_group_name = f'user_{self.user.id}'
 
             if self.channel_layer is not None:
-                await self.channel_layer.group_add(
-                    self.user_group_name,
-                    self.channel_name
-                )
-
-                if self.user.is_staff or self.user.is_superuser:
-                    await self.channel_layer.group_add(
-                        'admin_notifications',
-                        self.channel_name
-                    )
-
                 try:
                     self.user_courses = await self.get_user_courses()
-                    for course_id in self.user_courses:
-                        await self.channel_layer.group_add(
-                            f'course-updates-{course_id}',
-                            self.channel_name
-                        )
                 except Exception as e:
                     logger.warning(f"Failed to get user courses for WebSocket: {e}")
                     self.user_courses = []
 
+                failed = await group_add_many(
+                    self.channel_layer,
+                    self.get_group_names(),
+                    self.channel_name
+                )
+                if self.user_group_name in failed:
+                    await group_discard_many(
+                        self.channel_layer,
+                        self.get_group_names(),
+                        self.channel_name
+                    )
+                    raise RuntimeError(f"Could not join {self.user_group_name}")
+
             self.connection_established = True
             await self.accept()
+            await self.send_unread_count()
 
         except Exception as e:
             logger.error(f"WebSocket connection error: {e}")
@@ -73,41 +78,32 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         try:
             if (self.channel_layer is not None and
                 getattr(self, 'connection_established', False)):
-
-                user_group_name = getattr(self, 'user_group_name', None)
-                if user_group_name:
-                    try:
-                        await self.channel_layer.group_discard(
-                            user_group_name,
-                            self.channel_name
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error leaving user group: {e}")
-
-                user = getattr(self, 'user', None)
-                if user and hasattr(user, 'is_staff') and (user.is_staff or user.is_superuser):
-                    try:
-                        await self.channel_layer.group_discard(
-                            'admin_notifications',
-                            self.channel_name
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error leaving admin group: {e}")
-
-                user_courses = getattr(self, 'user_courses', [])
-                if user_courses and isinstance(user_courses, list):
-                    for course_id in user_courses:
-                        try:
-                            await self.channel_layer.group_discard(
-                                f'course-updates-{course_id}',
-                                self.channel_name
-                            )
-                        except Exception as e:
-                            logger.warning(f"Error leaving course group {course_id}: {e}")
+                failed = await group_discard_many(
+                    self.channel_layer,
+                    self.get_group_names(),
+                    self.channel_name
+                )
+                if failed:
+                    logger.warning(f"Error leaving {len(failed)} groups on disconnect")
 
         except Exception as e:
             logger.error(f"Unexpected error in WebSocket disconnect: {e}")
     
+    def get_group_names(self):
+        """All groups this connection belongs to: user, admin and course updates."""
+        groups = []
+        if getattr(self, 'user_group_name', None):
+            groups.append(self.user_group_name)
+
+        user = getattr(self, 'user', None)
+        if user and (getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False)):
+            groups.append('admin_notifications')
+
+        user_courses = getattr(self, 'user_courses', [])
+        if isinstance(user_courses, list):
+            groups.extend(f'course-updates-{course_id}' for course_id in user_courses)
+        return groups
+    
     async def receive(self, text_data):
         """Handle incoming WebSocket messages with validation"""
         try:
@@ -123,28 +119,90 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             
             if not notification_id or not isinstance(notification_id, int):
                 logger.warning(f"Invalid notification_id: {notification_id}")
-                await self.send(text_data=json.dumps({
+                await self.send_frame({
                     'type': 'error',
                     'message': 'Invalid notification_id'
-                }))
+                })
                 return
             
             success = await self.mark_notification_read(notification_id)
             
-            await self.send(text_data=json.dumps({
+            await self.send_frame({
                 'type': 'notification_marked_read',
                 'notification_id': notification_id,
                 'success': success
-            }))
+            })
+        elif message_type == 'mark_read_many':
+            notification_ids = data.get('notification_ids')
+
+            if (not isinstance(notification_ids, list) or not notification_ids
+                    or len(notification_ids) > MAX_MARK_READ_BATCH
+                    or not all(isinstance(i, int) and not isinstance(i, bool)
+                               for i in notification_ids)):
+                logger.warning(f"Invalid notification_ids: {notification_ids!r:.200}")
+                await self.send_frame({
+                    'type': 'error',
+                    'message': f'notification_ids must be a list of 1 to {MAX_MARK_READ_BATCH} integers'
+                })
+                return
+
+            marked_ids = await self.mark_notifications_read(notification_ids)
+            await self.send_marked_read(marked_ids)
+        elif message_type == 'mark_all_read':
+            marked_ids = await self.mark_notifications_read()
+            await self.send_marked_read(marked_ids)
         else:
             logger.warning(f"Unknown message type received: {message_type}")
     
+    async def send_marked_read(self, marked_ids):
+        """One reply frame for a batch; `success` is False if the update failed."""
+        await self.send_frame({
+            'type': 'notifications_marked_read',
+            'notification_ids': marked_ids or [],
+            'count': len(marked_ids or []),
+            'unread_count': await self.get_unread_count(),
+            'success': marked_ids is not None
+        })
+    
+    async def send_unread_count(self):
+        await self.send_frame({
+            'type': 'unread_count',
+            'count': await self.get_unread_count()
+        })
+    
+    @database_sync_to_async
+    def get_unread_count(self):
+        """Cached counter; only a cold counter runs a COUNT query."""
+        try:
+            return get_unread_count(self.user.id)
+        except Exception as e:
+            logger.error(f"Error getting unread count for user {self.user.id}: {e}")
+            return None
+    
     async def notification_message(self, event):
         """Handler for notification_message event from channel layer"""
-        await self.send(text_data=json.dumps({
+        await self.queue_send({
             'type': 'notification',
             'notification': event['notification']
-        }))
+        }, batch_key='notification')
+    
+    async def course_notifications_created(self, event):
+        """
+        Handler for course fan-outs: the new rows are only known by id in the
+        DB, so the client is told to reload. Repeated signals coalesce.
+        """
+        await self.queue_send({
+            'type': 'notifications_reload',
+            'course_id': event['course_id'],
+            'created_at': event['created_at']
+        }, coalesce_key='notifications_reload')
+    
+    def merge_batch(self, batch_key, frames):
+        """Consecutive queued notifications go out as one `notifications` frame."""
+        return {
+            'type': 'notifications',
+            'notifications': [frame['notification'] for frame in frames]
+        }
     
     @database_sync_to_async
     def get_user_courses(self):
@@ -155,7 +213,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
             course_content_type = ContentType.objects.get_for_model(Course)
             enrollments = Enrollment.objects.filter(
-                user=self.user,
+                user_id=self.user.id,
                 content_type=course_content_type,
                 status='active'
             ).values_list('object_id', flat=True)
@@ -168,6 +226,22 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             logger.error(f"Error getting user courses for WebSocket: {e}")
             return []
     
+    @database_sync_to_async
+    def mark_notifications_read(self, notification_ids=None):
+        """
+        Mark unread notifications of this user as read in one UPDATE.
+
+        Marks the given ids, or every unread notification when ids is None.
+        Returns the ids that changed from unread to read, or None on error.
+        """
+        try:
+            marked_ids = mark_read(self.user.id, notification_ids)
+            logger.debug(f"Marked {len(marked_ids)} notifications as read for user {self.user.id}")
+            return marked_ids
+        except Exception as e:
+            logger.error(f"Error marking notifications as read for user {self.user.id}: {e}")
+            return None
+    
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
         """Mark a notification as read with atomic transaction"""
@@ -175,7 +249,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             with transaction.atomic():
                 notification = Notification.objects.select_for_update().get(
                     id=notification_id,
-                    user=self.user
+                    user_id=self.user.id
                 )
                 if not notification.read:
                     notification.read = True
@@ -0,0 +1,75 @@
+"""
+Batched channel-layer group membership.
+
+Joining one group per enrolled course with sequential `await group_add()`
+calls costs one channel-layer round trip after another, so connect and
+disconnect latency grow linearly with enrollment count. These helpers run
+the operations concurrently, bounded by a semaphore so a user with
+thousands of enrollments cannot flood the channel layer.
+
+If the channel layer implements `group_add_many` / `group_discard_many`
+itself (one round trip per shard), that is used instead.
+"""
+import asyncio
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _concurrency(concurrency):
+    if concurrency is not None:
+        return concurrency
+    return getattr(settings, 'CHANNEL_GROUP_MAX_IN_FLIGHT', 32)
+
+
+async def _run_bounded(operation, groups, channel_name, concurrency):
+    """Run operation(group, channel_name) for every group, at most N at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(group):
+        async with semaphore:
+            try:
+                await operation(group, channel_name)
+                return None
+            except Exception as e:
+                logger.warning(f"Group operation failed for {group}: {e}")
+                return group
+
+    results = await asyncio.gather(*(run(group) for group in groups))
+    return [group for group in results if group is not None]
+
+
+async def group_add_many(channel_layer, groups, channel_name, concurrency=None):
+    """
+    Add a channel to many groups concurrently.
+
+    Returns:
+        List of groups that could not be joined
+    """
+    groups = list(dict.fromkeys(groups))
+    if not groups:
+        return []
+    if hasattr(channel_layer, 'group_add_many'):
+        return await channel_layer.group_add_many(groups, channel_name) or []
+    return await _run_bounded(
+        channel_layer.group_add, groups, channel_name, _concurrency(concurrency)
+    )
+
+
+async def group_discard_many(channel_layer, groups, channel_name, concurrency=None):
+    """
+    Remove a channel from many groups concurrently.
+
+    Returns:
+        List of groups that could not be left
+    """
+    groups = list(dict.fromkeys(groups))
+    if not groups:
+        return []
+    if hasattr(channel_layer, 'group_discard_many'):
+        return await channel_layer.group_discard_many(groups, channel_name) or []
+    return await _run_bounded(
+        channel_layer.group_discard, groups, channel_name, _concurrency(concurrency)
+    )
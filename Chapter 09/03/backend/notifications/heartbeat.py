@@ -0,0 +1,124 @@
+"""
+Server-driven heartbeat and idle reaping for websocket consumers.
+
+A client that vanishes without a close frame (sleeping laptop, dropped
+mobile network) leaves a half-open socket behind. Its consumer keeps its
+group memberships, including one `course-updates-*` group per enrollment,
+until the channel layer's group expiry, and every group_send keeps paying
+for it.
+
+HeartbeatMixin pings the client every WS_PING_INTERVAL seconds. Any frame
+from the client, including the `{"type": "pong"}` reply, counts as
+activity. After WS_IDLE_TIMEOUT seconds without activity the connection is
+reaped: the consumer's `disconnect()` runs right away, so its groups are
+discarded without waiting for the ASGI server to notice the dead socket,
+and the socket is closed with code 4008.
+
+The mixin also keeps a per-process gauge of live connections per consumer
+class, read with `live_connections()`.
+
+Frames are sent with `send_frame()`, so the consumer must also use
+codecs.FrameCodecMixin (before this mixin, so binary pongs are decoded).
+
+Usage:
+    class NotificationConsumer(FrameCodecMixin, HeartbeatMixin, AsyncWebsocketConsumer):
+        ...
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+
+from channels.exceptions import StopConsumer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+IDLE_CLOSE_CODE = 4008
+
+_live_connections = Counter()
+
+
+def live_connections():
+    """Return {consumer class name: open connections} for this process."""
+    return {name: count for name, count in _live_connections.items() if count}
+
+
+class HeartbeatMixin:
+    ping_interval = None
+    idle_timeout = None
+
+    def get_ping_interval(self):
+        if self.ping_interval is not None:
+            return self.ping_interval
+        return getattr(settings, 'WS_PING_INTERVAL', 20)
+
+    def get_idle_timeout(self):
+        if self.idle_timeout is not None:
+            return self.idle_timeout
+        return getattr(settings, 'WS_IDLE_TIMEOUT', 60)
+
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        self.start_heartbeat()
+
+    def start_heartbeat(self):
+        if getattr(self, '_heartbeat_task', None) is not None:
+            return
+        self.last_seen = time.monotonic()
+        self._reaped = False
+        _live_connections[self.__class__.__name__] += 1
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    def stop_heartbeat(self):
+        task = getattr(self, '_heartbeat_task', None)
+        if task is None:
+            return
+        self._heartbeat_task = None
+        _live_connections[self.__class__.__name__] -= 1
+        if task is not asyncio.current_task():
+            task.cancel()
+
+    async def _heartbeat(self):
+        interval = self.get_ping_interval()
+        idle_timeout = self.get_idle_timeout()
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                idle = time.monotonic() - self.last_seen
+                if idle > idle_timeout:
+                    await self.reap_idle_connection(idle)
+                    return
+                await self.send_frame({'type': 'ping'})
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Heartbeat error in {self.__class__.__name__}: {e}")
+
+    async def reap_idle_connection(self, idle):
+        logger.info(f"Reaping {self.__class__.__name__} connection idle for {idle:.0f}s")
+        self._reaped = True
+        self.stop_heartbeat()
+        try:
+            await self.disconnect(IDLE_CLOSE_CODE)
+        finally:
+            await self.close(code=IDLE_CLOSE_CODE)
+
+    async def websocket_receive(self, message):
+        self.last_seen = time.monotonic()
+        text = message.get('text')
+        if text and '"pong"' in text:
+            try:
+                if json.loads(text).get('type') == 'pong':
+                    return
+            except (ValueError, AttributeError):
+                pass
+        await super().websocket_receive(message)
+
+    async def websocket_disconnect(self, message):
+        self.stop_heartbeat()
+        if getattr(self, '_reaped', False):
+            # disconnect() already ran when the connection was reaped
+            raise StopConsumer()
+        await super().websocket_disconnect(message)
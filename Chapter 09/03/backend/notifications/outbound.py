@@ -0,0 +1,149 @@
+"""
+Bounded per-connection outbound queue for websocket consumers.
+
+Channel-layer event handlers that `await self.send()` directly block the
+consumer on a slow client, and burst broadcasts back up in the channel
+layer. OutboundQueueMixin hands frames to a queue drained by a writer task
+instead:
+
+- Coalescing: a frame queued with a `coalesce_key` replaces a still-unsent
+  frame with the same key (for example a newer dashboard state).
+- Batching: consecutive frames with the same `batch_key` are merged into
+  one frame by `merge_batch()` (for example several notifications).
+- Backpressure: at WS_OUTBOUND_QUEUE_SIZE pending frames the
+  WS_OUTBOUND_OVERFLOW policy applies: `drop` discards the new frame,
+  `disconnect` closes the socket with code 4009 so the client reconnects
+  and reloads its state.
+
+Counters of dropped, coalesced and batched frames and overflow disconnects
+are kept per consumer class and read with `outbound_stats()`.
+
+Frames are written with `send_frame()` from codecs.FrameCodecMixin.
+"""
+import asyncio
+import logging
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_CLOSE_CODE = 4009
+
+_outbound_counters = defaultdict(Counter)
+
+
+def outbound_stats():
+    """Return {consumer class name: {counter: value}} for this process."""
+    return {name: dict(counters) for name, counters in _outbound_counters.items()}
+
+
+class OutboundQueueMixin:
+    outbound_queue_size = None
+    outbound_overflow = None
+    outbound_max_batch = None
+
+    def get_outbound_queue_size(self):
+        if self.outbound_queue_size is not None:
+            return self.outbound_queue_size
+        return getattr(settings, 'WS_OUTBOUND_QUEUE_SIZE', 100)
+
+    def get_outbound_overflow(self):
+        if self.outbound_overflow is not None:
+            return self.outbound_overflow
+        return getattr(settings, 'WS_OUTBOUND_OVERFLOW', 'drop')
+
+    def get_outbound_max_batch(self):
+        if self.outbound_max_batch is not None:
+            return self.outbound_max_batch
+        return getattr(settings, 'WS_OUTBOUND_MAX_BATCH', 50)
+
+    @property
+    def outbound_counters(self):
+        return _outbound_counters[self.__class__.__name__]
+
+    def merge_batch(self, batch_key, frames):
+        """Merge consecutive frames sharing a batch key into one frame."""
+        raise NotImplementedError
+
+    async def queue_send(self, frame, coalesce_key=None, batch_key=None):
+        """Queue a JSON frame for the writer task instead of sending inline."""
+        if getattr(self, '_outbound_closed', False):
+            return
+        if not hasattr(self, '_outbound'):
+            # Entries are [frame, coalesce_key, batch_key] lists so coalescing
+            # can replace a frame in place
+            self._outbound = deque()
+            self._outbound_by_key = {}
+            self._outbound_ready = asyncio.Event()
+            self._outbound_task = asyncio.create_task(self._drain_outbound())
+
+        if coalesce_key is not None and coalesce_key in self._outbound_by_key:
+            self._outbound_by_key[coalesce_key][0] = frame
+            self.outbound_counters['coalesced'] += 1
+            return
+
+        if len(self._outbound) >= self.get_outbound_queue_size():
+            await self._outbound_overflow()
+            return
+
+        entry = [frame, coalesce_key, batch_key]
+        self._outbound.append(entry)
+        if coalesce_key is not None:
+            self._outbound_by_key[coalesce_key] = entry
+        self._outbound_ready.set()
+
+    async def _outbound_overflow(self):
+        if self.get_outbound_overflow() == 'disconnect':
+            logger.warning(f"{self.__class__.__name__} outbound queue full, disconnecting client")
+            self.outbound_counters['disconnected'] += 1
+            self.outbound_counters['dropped'] += len(self._outbound) + 1
+            self.stop_outbound()
+            await self.close(code=OVERFLOW_CLOSE_CODE)
+        else:
+            self.outbound_counters['dropped'] += 1
+
+    def _next_outbound_frame(self):
+        frame, coalesce_key, batch_key = self._outbound.popleft()
+        if coalesce_key is not None:
+            del self._outbound_by_key[coalesce_key]
+        if batch_key is None:
+            return frame
+
+        frames = [frame]
+        max_batch = self.get_outbound_max_batch()
+        while (self._outbound and len(frames) < max_batch
+               and self._outbound[0][2] == batch_key and self._outbound[0][1] is None):
+            frames.append(self._outbound.popleft()[0])
+        if len(frames) == 1:
+            return frame
+        self.outbound_counters['batched'] += len(frames) - 1
+        return self.merge_batch(batch_key, frames)
+
+    async def _drain_outbound(self):
+        try:
+            while True:
+                await self._outbound_ready.wait()
+                while self._outbound:
+                    frame = self._next_outbound_frame()
+                    await self.send_frame(frame)
+                self._outbound_ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Outbound writer error in {self.__class__.__name__}: {e}")
+
+    def stop_outbound(self):
+        """Stop the writer task and discard unsent frames."""
+        self._outbound_closed = True
+        task = getattr(self, '_outbound_task', None)
+        if task is not None:
+            self._outbound_task = None
+            self._outbound.clear()
+            self._outbound_by_key.clear()
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    async def websocket_disconnect(self, message):
+        self.stop_outbound()
+        await super().websocket_disconnect(message)
@@ -0,0 +1,81 @@
+"""
+Set-based mark-as-read.
+
+Marking notifications one by one takes a row lock and a save() per
+notification. `mark_read` issues a single
+
+    UPDATE notifications SET read = true
+    WHERE user_id = %s AND read = false [AND id IN (...)]
+    RETURNING id
+
+so clearing an inbox is one statement whatever its size. Databases without
+UPDATE ... RETURNING select the ids first inside the same transaction.
+"""
+from django.db import connection, transaction
+
+from .models import Notification
+from .signals import notifications_marked_read
+
+MAX_MARK_READ_BATCH = 500
+
+RETURNING_VENDORS = ('postgresql', 'sqlite')
+
+
+def _update_returning(user_id, notification_ids):
+    opts = Notification._meta
+    quote = connection.ops.quote_name
+    read_column = quote(opts.get_field('read').column)
+    sql = (
+        f'UPDATE {quote(opts.db_table)} SET {read_column} = %s '
+        f'WHERE {quote(opts.get_field("user").column)} = %s AND {read_column} = %s'
+    )
+    params = [True, user_id, False]
+    if notification_ids is not None:
+        sql += f' AND {quote(opts.pk.column)} IN ({", ".join(["%s"] * len(notification_ids))})'
+        params.extend(notification_ids)
+    sql += f' RETURNING {quote(opts.pk.column)}'
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _select_then_update(user_id, notification_ids):
+    unread = Notification.objects.filter(user_id=user_id, read=False)
+    if notification_ids is not None:
+        unread = unread.filter(id__in=notification_ids)
+    marked_ids = sorted(unread.select_for_update().values_list('id', flat=True))
+    if marked_ids:
+        Notification.objects.filter(id__in=marked_ids).update(read=True)
+    return marked_ids
+
+
+def mark_read(user_id, notification_ids=None):
+    """
+    Mark a user's unread notifications as read.
+
+    Args:
+        user_id: Owner of the notifications; other users' ids are ignored
+        notification_ids: Ids to mark, or None for every unread notification
+
+    Returns:
+        Sorted ids that changed from unread to read
+    """
+    if notification_ids is not None:
+        notification_ids = sorted(set(notification_ids))
+        if not notification_ids:
+            return []
+
+    with transaction.atomic():
+        if connection.vendor in RETURNING_VENDORS:
+            marked_ids = _update_returning(user_id, notification_ids)
+        else:
+            marked_ids = _select_then_update(user_id, notification_ids)
+
+        if marked_ids:
+            transaction.on_commit(
+                lambda: notifications_marked_read.send(
+                    sender=Notification, user_id=user_id, notification_ids=marked_ids
+                )
+            )
+    return marked_ids
@@ -0,0 +1,54 @@
+"""
+Notification signals and the receivers that keep unread counters current.
+
+Bulk inserts and set-based UPDATEs do not send model signals, so caches
+keyed by unread notifications (unread counters, dashboard snapshots)
+listen to the custom signals below as well as to the model signals.
+"""
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Notification
+from .unread import adjust_unread_count, forget_unread_counts
+
+# Sent after fan-out chunks commit, with `user_ids` (list of recipient ids)
+notifications_bulk_created = Signal()
+
+# Sent after a bulk mark-as-read commits, with `user_id` and
+# `notification_ids` (ids that changed from unread to read)
+notifications_marked_read = Signal()
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    """Keep the loaded read flag so post_save can detect changes."""
+    # Read from __dict__ so a deferred field is not fetched
+    instance._unread_was_read = instance.__dict__.get('read')
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created:
+        delta = 0 if instance.read else 1
+    elif instance._unread_was_read is None:
+        delta = 0
+    else:
+        delta = int(bool(instance._unread_was_read)) - int(bool(instance.read))
+    adjust_unread_count(instance.user_id, delta)
+    instance._unread_was_read = instance.read
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if instance._unread_was_read is False:
+        adjust_unread_count(instance.user_id, -1)
+
+
+@receiver(notifications_bulk_created)
+def bulk_created_unread(sender, user_ids, **kwargs):
+    forget_unread_counts(user_ids)
+
+
+@receiver(notifications_marked_read)
+def marked_read_unread(sender, user_id, notification_ids, **kwargs):
+    adjust_unread_count(user_id, -len(notification_ids))
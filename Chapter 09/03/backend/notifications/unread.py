@@ -0,0 +1,89 @@
+"""
+Cache-backed unread notification counter per user.
+
+Counting unread rows scans a user's notification history on every
+dashboard refresh. The count is kept in the cache instead:
+
+    notifications:unread:<user_id>
+
+- Reads are one cache GET; a missing key is recounted once from the DB.
+- Single creates, reads and deletes adjust the counter with incr/decr
+  (receivers in signals.py).
+- Bulk fan-outs drop the affected keys in one delete_many; those users
+  are recounted on their next read.
+- Missing keys are never incremented, so a counter only exists once it
+  was seeded from an actual count.
+
+Any drift (lost updates, raw SQL) is bounded by UNREAD_COUNT_TIMEOUT and
+corrected by the reconcile_unread_counts command.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Notification
+
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, read=False).count()
+
+
+def get_unread_count(user_id):
+    """Return the unread count, seeding the counter from the DB on a miss."""
+    count = cache.get(unread_key(user_id))
+    if count is None:
+        count = count_unread(user_id)
+        cache.add(unread_key(user_id), count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """Apply a delta to an existing counter; a missing counter is left alone."""
+    if not delta:
+        return
+    key = unread_key(user_id)
+    try:
+        value = cache.incr(key, delta) if delta > 0 else cache.decr(key, -delta)
+    except ValueError:
+        return
+    if value < 0:
+        cache.delete(key)
+
+
+def forget_unread_counts(user_ids):
+    cache.delete_many([unread_key(user_id) for user_id in user_ids])
+
+
+def reconcile_unread_counts(user_ids):
+    """
+    Correct cached counters for a batch of users.
+
+    Only users with a cached counter are checked; their counts come from one
+    grouped query. Returns the number of corrected counters.
+    """
+    keys = {unread_key(user_id): user_id for user_id in user_ids}
+    cached = cache.get_many(list(keys))
+    if not cached:
+        return 0
+
+    cached_user_ids = [keys[key] for key in cached]
+    actual = dict(
+        Notification.objects.filter(user_id__in=cached_user_ids, read=False)
+        .values_list('user_id')
+        .annotate(unread=Count('id'))
+        .order_by()
+    )
+
+    corrected = {}
+    for key, value in cached.items():
+        count = actual.get(keys[key], 0)
+        if value != count:
+            corrected[key] = count
+    if corrected:
+        cache.set_many(corrected, UNREAD_COUNT_TIMEOUT)
+    return len(corrected)
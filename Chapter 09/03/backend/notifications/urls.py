@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('courses/<int:course_id>/', views.CourseNotificationView.as_view(), name='course-notification'),
+    path('connections/', views.ConnectionStatsView.as_view(), name='notification-connections'),
+]
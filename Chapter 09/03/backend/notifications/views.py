@@ -0,0 +1,49 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from courses.models import Course
+
+from .fanout import fan_out_course_notification
+from .heartbeat import live_connections
+from .outbound import outbound_stats
+
+
+class CourseNotificationView(APIView):
+    """
+    Notify every user enrolled in a course.
+
+    POST {"message": "..."} as the course instructor or a staff user.
+    Responds with the fan-out report (recipients, chunks, timings).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, course_id):
+        course = get_object_or_404(Course, id=course_id)
+        if not (request.user.is_staff or course.instructor_id == request.user.id):
+            return Response(
+                {'error': 'Only the course instructor can notify its students'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        message = (request.data.get('message') or '').strip()
+        if not message:
+            return Response(
+                {'message': ['This field is required.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = fan_out_course_notification(course.id, message)
+        return Response(report, status=status.HTTP_201_CREATED)
+
+
+class ConnectionStatsView(APIView):
+    """Live connections and outbound queue counters per consumer class in this worker process."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'live_connections': live_connections(),
+            'outbound': outbound_stats()
+        })
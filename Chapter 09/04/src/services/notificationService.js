@@ -11,9 +11,12 @@ class NotificationService {
     this.reconnectDelay = 1000;
     this.maxReconnectDelay = 30000;
     this.heartbeatInterval = null;
+    this.reloadJitter = 5000;
+    this.reloadTimeout = null;
     this.userId = null;
     this.callbacks = {
       onMessage: null,
+      onReload: null,
       onConnect: null,
       onDisconnect: null,
       onError: null,
@@ -73,6 +76,18 @@ class NotificationService {
                 this.callbacks.onMessage(data.notification);
               }
               break;
+            case 'notifications':
+              // Notifications queued together on the server arrive as one batch
+              if (this.callbacks.onMessage) {
+                data.notifications.forEach((notification) => this.callbacks.onMessage(notification));
+              }
+              break;
+            case 'notifications_reload':
+              // A course announcement created notifications for every
+              // enrolled user; fetch them from the API, spread out so all
+              // subscribers of the course do not reload at once
+              this.scheduleReload();
+              break;
             case 'notification_marked_read':
               console.log(`Notification ${data.notification_id} marked as read`);
               break;
@@ -155,6 +170,21 @@ class NotificationService {
     }, delay);
   }
 
+  /**
+   * Call onReload once after a random delay of up to reloadJitter ms
+   */
+  scheduleReload() {
+    if (!this.callbacks.onReload || this.reloadTimeout) {
+      return;
+    }
+    this.reloadTimeout = setTimeout(() => {
+      this.reloadTimeout = null;
+      if (this.callbacks.onReload) {
+        this.callbacks.onReload();
+      }
+    }, Math.random() * this.reloadJitter);
+  }
+
   /**
    * Start heartbeat to keep connection alive
    */
@@ -233,6 +263,8 @@ class NotificationService {
   disconnect() {
     console.log('Disconnecting WebSocket');
     this.stopHeartbeat();
+    clearTimeout(this.reloadTimeout);
+    this.reloadTimeout = null;
 
     if (this.socket) {
       this.socket.close(1000, 'Manual disconnect');
@@ -0,0 +1,135 @@
+"""
+Versioned snapshot protocol for dashboard updates.
+
+Sending the whole dashboard on every change repeats `user_info`, the recent
+enrollments and the notification list even when only a counter moved.
+Each connection instead keeps a SnapshotSession that numbers the states it
+sends and remembers which one the client acknowledged:
+
+    server -> {"type": "dashboard_update", "version": 1, "payload": {...}}
+    client -> {"type": "ack", "version": 1}
+    server -> {"type": "dashboard_patch", "base_version": 1, "version": 2,
+               "ops": [{"op": "replace", "path": "/pending_notifications_count",
+                        "value": 4}]}
+
+Patches are JSON Patch (RFC 6902) style `add`, `remove` and `replace`
+operations against the acknowledged version. Nested objects are diffed
+key by key; lists are replaced whole. A client that cannot apply a patch
+(its version differs from `base_version`) sends {"type": "resync"} and
+receives a full snapshot. Clients that never acknowledge keep receiving
+full `dashboard_update` frames, as before.
+"""
+from collections import OrderedDict
+
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def diff(old, new, path=''):
+    """Return the operations that turn dict `old` into dict `new`."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+
+    for key, value in new.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            ops.extend(diff(old[key], value, pointer))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+def apply_patch(document, ops):
+    """
+    Apply operations from diff() to a copy of a document.
+
+    Reference implementation of the client side, used by Python clients
+    and load tests.
+    """
+    document = dict(document)
+    for op in ops:
+        tokens = [_unescape(token) for token in op["path"].split('/')[1:]]
+        target = document
+        for token in tokens[:-1]:
+            target[token] = dict(target[token])
+            target = target[token]
+        if op["op"] == "remove":
+            del target[tokens[-1]]
+        else:
+            target[tokens[-1]] = op["value"]
+    return document
+
+
+class SnapshotSession:
+    """
+    Per-connection version bookkeeping.
+
+    Sent states are kept until acknowledged, bounded by `max_pending`.
+    States are shared, never mutated, so keeping several costs little
+    beyond the sections that actually differ.
+    """
+
+    max_pending = 4
+
+    def __init__(self):
+        self.version = 0
+        self.acked_version = None
+        self.acked = None
+        self.pending = OrderedDict()
+
+    def _remember(self, snapshot):
+        self.version += 1
+        self.pending[self.version] = snapshot
+        while len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+        return self.version
+
+    def full_frame(self, snapshot):
+        version = self._remember(snapshot)
+        return {
+            "type": "dashboard_update",
+            "version": version,
+            "payload": snapshot
+        }
+
+    def patch_frame(self, snapshot):
+        """Diff against the acknowledged state, or send it whole if there is none."""
+        if self.acked is None:
+            return self.full_frame(snapshot)
+
+        ops = diff(self.acked, snapshot)
+        base_version = self.acked_version
+        version = self._remember(snapshot)
+        return {
+            "type": "dashboard_patch",
+            "base_version": base_version,
+            "version": version,
+            "ops": ops
+        }
+
+    def ack(self, version):
+        """Record a client acknowledgement; False if the version is unknown."""
+        snapshot = self.pending.get(version)
+        if snapshot is None:
+            return False
+        self.acked_version = version
+        self.acked = snapshot
+        for sent in list(self.pending):
+            if sent <= version:
+                del self.pending[sent]
+        return True
+
+    def reset(self):
+        """Forget the client's state so the next frame is a full snapshot."""
+        self.acked_version = None
+        self.acked = None
+        self.pending.clear()
@@ -0,0 +1,55 @@
+"""
+Keep cached dashboard snapshots in step with enrollment and notification
+writes.
+
+Each handler refreshes only the snapshot section the model feeds and pushes
+the changed keys to the user's open dashboards. The work runs after the
+transaction commits so the rebuilt section sees the committed rows.
+"""
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from enrollments.models import Enrollment
+from notifications.models import Notification
+from notifications.signals import notifications_bulk_created, notifications_marked_read
+
+from .snapshots import refresh_sections, push_changes, snapshot_key
+
+
+def refresh_and_push(user_id, sections):
+    changes = refresh_sections(user_id, sections)
+    push_changes(user_id, changes)
+
+
+def schedule_refresh(user_id, sections):
+    if user_id is None:
+        return
+    transaction.on_commit(partial(refresh_and_push, user_id, sections))
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    schedule_refresh(instance.user_id, ['enrollments'])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    schedule_refresh(instance.user_id, ['notifications'])
+
+
+@receiver(notifications_bulk_created)
+def notifications_bulk_created_handler(sender, user_ids, **kwargs):
+    # Course-wide fan-outs can reach 100k users; rebuilding each snapshot
+    # would cost a query per user, so drop them and rebuild on next read
+    cache.delete_many([snapshot_key(user_id) for user_id in user_ids])
+
+
+@receiver(notifications_marked_read)
+def notifications_marked_read_handler(sender, user_id, **kwargs):
+    refresh_and_push(user_id, ['notifications'])
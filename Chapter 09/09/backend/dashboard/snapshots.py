@@ -0,0 +1,182 @@
+"""
+Per-user dashboard snapshots.
+
+Building a dashboard costs several queries (enrollment counts, recent
+enrollments, unread notifications). Instead of running them on every
+`connect` and `request_update`, the assembled snapshot is cached per user:
+
+    dashboard:snapshot:<user_id>
+
+The snapshot is split into sections, each owning a set of payload keys.
+When an enrollment or notification changes, signals.py rebuilds only the
+affected section, patches the cached snapshot and pushes the keys that
+actually changed to the user's dashboard group through `dashboard_broadcast`.
+Polling a connected dashboard therefore reads the cache and never the DB.
+
+Users without a cached snapshot (no recent dashboard) are skipped on writes;
+their snapshot is built on the next connect.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from enrollments.models import Enrollment
+from notifications.models import Notification
+from notifications.unread import get_unread_count
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TIMEOUT = 60 * 60
+
+RECENT_ENROLLMENTS_LIMIT = 3
+PENDING_NOTIFICATIONS_LIMIT = 5
+
+
+def snapshot_key(user_id):
+    return f'dashboard:snapshot:{user_id}'
+
+
+def dashboard_group_name(user_id):
+    return f'dashboard_user_{user_id}'
+
+
+def build_user_info(user):
+    """Built from the authenticated user object, so it costs no query."""
+    return {
+        "user_info": {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "is_instructor": user.is_staff
+        }
+    }
+
+
+def build_enrollment_section(user_id):
+    counts = Enrollment.objects.filter(
+        user_id=user_id,
+        status='active'
+    ).aggregate(
+        total=Count('id'),
+        courses=Count('object_id', distinct=True)
+    )
+
+    enrollments = Enrollment.objects.filter(
+        user_id=user_id
+    ).order_by('-created_at')[:RECENT_ENROLLMENTS_LIMIT]
+
+    return {
+        "enrolled_courses_count": counts['courses'],
+        "recent_enrollments": [
+            {
+                'course_id': e.object_id,
+                'course_name': e.course.title if hasattr(e, 'course') else 'N/A',
+                'status': e.status,
+                'enrolled_date': e.created_at.isoformat()
+            }
+            for e in enrollments
+        ],
+        "course_completion_stats": {
+            'total_enrolled': counts['total'],
+            'in_progress': counts['total'],
+            'completed': 0
+        }
+    }
+
+
+def build_notification_section(user_id):
+    # The count comes from the maintained counter, so only the few newest
+    # unread rows are read from the DB, and none when there are none
+    unread_count = get_unread_count(user_id)
+    notifications = []
+    if unread_count:
+        notifications = Notification.objects.filter(
+            user_id=user_id,
+            read=False
+        ).order_by('-created_at')[:PENDING_NOTIFICATIONS_LIMIT]
+
+    return {
+        "pending_notifications_count": unread_count,
+        "pending_notifications": [
+            {
+                'id': n.id,
+                'message': n.message,
+                'created_at': n.created_at.isoformat()
+            }
+            for n in notifications
+        ]
+    }
+
+
+SECTION_BUILDERS = {
+    'enrollments': build_enrollment_section,
+    'notifications': build_notification_section,
+}
+
+
+def build_snapshot(user):
+    """Run every section query for a user and assemble the dashboard payload."""
+    snapshot = build_user_info(user)
+    for builder in SECTION_BUILDERS.values():
+        snapshot.update(builder(user.id))
+    snapshot["timestamp"] = timezone.now().isoformat()
+    return snapshot
+
+
+def get_snapshot(user):
+    """Return the cached snapshot for a user, building it on a miss."""
+    snapshot = cache.get(snapshot_key(user.id))
+    if snapshot is None:
+        snapshot = build_snapshot(user)
+        cache.set(snapshot_key(user.id), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def refresh_sections(user_id, sections):
+    """
+    Rebuild sections of a cached snapshot and return the keys that changed.
+
+    Returns an empty dict when the user has no cached snapshot.
+    """
+    key = snapshot_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        return {}
+
+    changes = {}
+    for section in sections:
+        for field, value in SECTION_BUILDERS[section](user_id).items():
+            if snapshot.get(field) != value:
+                changes[field] = value
+
+    if changes:
+        changes["timestamp"] = timezone.now().isoformat()
+        snapshot.update(changes)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return changes
+
+
+def push_changes(user_id, changes):
+    """Send changed snapshot keys to every open dashboard of a user."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not changes:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            dashboard_group_name(user_id),
+            {
+                "type": "dashboard_broadcast",
+                "delta": True,
+                "payload": changes
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error pushing dashboard changes for user {user_id}: {e}")
+
+
+def invalidate_snapshot(user_id):
+    cache.delete(snapshot_key(user_id))
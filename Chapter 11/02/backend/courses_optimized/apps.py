@@ -5,3 +5,6 @@ class CoursesOptimizedConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses_optimized'
     verbose_name = 'Optimized Courses'
+
+    def ready(self):
+        from . import signals  # noqa: F401
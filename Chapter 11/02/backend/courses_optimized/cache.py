@@ -0,0 +1,151 @@
+"""
+Versioned Query Cache for Optimized Course Lists
+
+Cache keys are built from the normalized query parameters of a request plus a
+per-collection version counter:
+
+    courses_optimized:course_pages:v<version>:<sha1 of normalized params>
+
+Any course create, update or delete bumps the version, so every cached
+variant (all pages, searches, orderings, page sizes) becomes unreachable in
+O(1) instead of sweeping known keys with delete_many(). Stale entries simply
+age out through their TTL. Lists also show CourseStats.enrolled_count, so
+enrollment deltas and the stats recompute/reconcile writes bump it too,
+after their transaction commits (CourseStats.invalidate_course_lists).
+
+Entries hold the page body without its next/previous links, plus the query
+parameter changes that produce them; the links are rebuilt from each
+request (pagination.render_cached_page), so the host and any parameters
+not in the key never leak between requests.
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+
+class VersionedQueryCache:
+    """
+    Cache for query-dependent responses of a single collection.
+
+    Args:
+        namespace: Collection name used in every key
+        params: Query parameters that change the response
+        defaults: Values assumed when a parameter is missing, so that
+                  `?page=1` and no page parameter share one entry. A
+                  callable receives the given parameters and returns the
+                  default, or None when there is none
+        timeout: TTL in seconds for cached responses
+    """
+
+    def __init__(self, namespace, params, defaults=None, timeout=300):
+        self.namespace = namespace
+        self.params = tuple(params)
+        self.defaults = defaults or {}
+        self.timeout = timeout
+
+    @property
+    def version_key(self):
+        return f'courses_optimized:{self.namespace}:version'
+
+    def _metric_key(self, name):
+        return f'courses_optimized:{self.namespace}:metrics:{name}'
+
+    def _incr(self, key, initial=1):
+        """Atomically increment a counter, creating it if it does not exist."""
+        try:
+            return cache.incr(key)
+        except ValueError:
+            if cache.add(key, initial, None):
+                return initial
+            return cache.incr(key)
+
+    def get_version(self):
+        """Return the current collection version."""
+        version = cache.get(self.version_key)
+        if version is None:
+            # Seed from the clock so an evicted counter never reuses
+            # a version whose entries may still be cached.
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        """Invalidate every cached variant by bumping the version."""
+        return self._incr(self.version_key, initial=int(time.time() * 1000))
+
+    def normalize(self, query_params):
+        """
+        Reduce query parameters to a canonical, order-independent form.
+
+        Unknown parameters are ignored and empty values are dropped.
+        """
+        given = {}
+        for name in self.params:
+            value = query_params.get(name)
+            if value is not None:
+                value = str(value).strip()
+            if value:
+                given[name] = value
+
+        normalized = dict(given)
+        for name, default in self.defaults.items():
+            if name in given:
+                continue
+            if callable(default):
+                default = default(given)
+            if default not in (None, ''):
+                normalized[name] = str(default)
+        return normalized
+
+    def make_key(self, query_params):
+        """Build the versioned cache key for a set of query parameters."""
+        normalized = json.dumps(self.normalize(query_params), sort_keys=True)
+        digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        return f'courses_optimized:{self.namespace}:v{self.get_version()}:{digest}'
+
+    def get(self, key):
+        """Return cached data for a key from make_key(), or None on a miss."""
+        data = cache.get(key)
+        self._incr(self._metric_key('hits' if data is not None else 'misses'))
+        return data
+
+    def set(self, key, data):
+        """
+        Cache data under a key from make_key().
+
+        Build the key before querying the database: if a write bumps the
+        version mid-request, the result lands under the old version and is
+        never served.
+        """
+        cache.set(key, data, self.timeout)
+
+    def metrics(self):
+        """Return hit/miss counters for scraping."""
+        hits = cache.get(self._metric_key('hits'), 0)
+        misses = cache.get(self._metric_key('misses'), 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0.0,
+            'version': self.get_version(),
+        }
+
+
+course_list_cache = VersionedQueryCache(
+    'course_pages',
+    params=(
+        'page', 'page_size', 'search', 'ordering', 'instructor_id', 'status',
+        'pagination', 'cursor', 'count',
+    ),
+    defaults={
+        'page': '1',
+        'page_size': '10',
+        # Searches without an ordering are sorted by relevance, so only
+        # plain listings default to the newest first
+        'ordering': lambda given: None if 'search' in given else '-created_at',
+    },
+    timeout=300,
+)
@@ -0,0 +1,74 @@
+"""
+Periodic reconciliation job for denormalized CourseStats.
+
+Incremental F() deltas keep CourseStats current, but rows can still drift
+(bulk operations that skip signals, failed transactions, manual edits).
+This command walks all courses in batches and corrects drifted rows with
+one grouped aggregate per batch.
+
+With --rebuild every row is rewritten through CourseStats.batch_update_stats
+(one aggregate plus one bulk update per chunk), which suits a nightly full resync.
+
+Usage:
+    python manage.py reconcile_course_stats
+    python manage.py reconcile_course_stats --batch-size 5000
+    python manage.py reconcile_course_stats --rebuild
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses_optimized.models import OptimizedCourse, CourseStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute drifted CourseStats enrollment counters in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of courses reconciled per grouped query'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Rewrite every stats row instead of only drifted ones'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        start = time.monotonic()
+        checked = 0
+        corrected = 0
+
+        course_ids = OptimizedCourse.objects.order_by('id').values_list('id', flat=True)
+
+        if options['rebuild']:
+            reports = CourseStats.batch_update_stats(course_ids, chunk_size=batch_size)
+            for report in reports:
+                self.stdout.write(
+                    f"Chunk {report['chunk']}: {report['rows']} rows in {report['elapsed_ms']}ms"
+                )
+            elapsed = time.monotonic() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt stats for {sum(r["rows"] for r in reports)} courses in {elapsed:.2f}s'
+            ))
+            return
+
+        batch = []
+        for course_id in course_ids.iterator(chunk_size=batch_size):
+            batch.append(course_id)
+            if len(batch) == batch_size:
+                corrected += CourseStats.reconcile_stats(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            corrected += CourseStats.reconcile_stats(batch)
+            checked += len(batch)
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} courses, corrected {corrected} stats rows in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.3 on 2026-10-17 12:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptimizedCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(db_index=True, max_length=255)),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('description', models.TextField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('rating', models.DecimalField(db_index=True, decimal_places=1, default=0.0, max_digits=3)),
+                ('enrolled', models.IntegerField(db_index=True, default=0)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('draft', 'Draft'), ('archived', 'Archived')], db_index=True, default='draft', max_length=20)),
+                ('thumbnail', models.URLField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='optimized_courses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Optimized Course',
+                'verbose_name_plural': 'Optimized Courses',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enrolled_count', models.IntegerField(db_index=True, default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('avg_rating', models.DecimalField(decimal_places=1, default=0.0, max_digits=3)),
+                ('total_reviews', models.IntegerField(default=0)),
+                ('rating_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_enrollment', models.DateTimeField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='courses_optimized.optimizedcourse')),
+            ],
+            options={
+                'verbose_name': 'Course Stats',
+                'verbose_name_plural': 'Course Stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='optimizedcourse',
+            index=models.Index(fields=['status', 'created_at'], name='courses_opt_status_9f30fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='optimizedcourse',
+            index=models.Index(fields=['instructor', 'status'], name='courses_opt_instruc_ee5039_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='optimizedcourse',
+            index=models.Index(fields=['rating', '-enrolled'], name='courses_opt_rating_fe2597_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['enrolled_count'], name='courses_opt_enrolle_f37b76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['avg_rating'], name='courses_opt_avg_rat_a89ae9_idx'),
+        ),
+    ]
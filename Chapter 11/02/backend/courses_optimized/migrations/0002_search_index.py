@@ -0,0 +1,94 @@
+"""
+Full-text search index for OptimizedCourse, maintained by the database.
+
+- PostgreSQL: `search_vector` is a stored generated tsvector column with a
+  GIN index, recomputed by the database on every insert and update
+- SQLite: an FTS5 table keyed by course id, kept in sync by triggers on
+  the course table
+
+Other databases get nothing and fall back to BasicSearchBackend. The
+column and table are not model fields, so the model stays portable.
+
+SQLite drops triggers when Django rebuilds a table for an ALTER; a later
+migration that alters the course table on SQLite must run
+`create_sqlite_triggers` again.
+"""
+from django.db import migrations
+
+TABLE = 'courses_optimized_optimizedcourse'
+FTS_TABLE = f'{TABLE}_fts'
+SEARCH_CONFIG = 'english'
+
+POSTGRES_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
+SQLITE_TRIGGERS = {
+    f'{TABLE}_fts_insert': (
+        f'AFTER INSERT ON "{TABLE}" BEGIN '
+        f'INSERT INTO "{FTS_TABLE}" (rowid, title, description) '
+        f'VALUES (new.id, new.title, new.description); END'
+    ),
+    f'{TABLE}_fts_update': (
+        f'AFTER UPDATE OF id, title, description ON "{TABLE}" BEGIN '
+        f'DELETE FROM "{FTS_TABLE}" WHERE rowid = old.id; '
+        f'INSERT INTO "{FTS_TABLE}" (rowid, title, description) '
+        f'VALUES (new.id, new.title, new.description); END'
+    ),
+    f'{TABLE}_fts_delete': (
+        f'AFTER DELETE ON "{TABLE}" BEGIN '
+        f'DELETE FROM "{FTS_TABLE}" WHERE rowid = old.id; END'
+    ),
+}
+
+
+def create_sqlite_triggers(schema_editor):
+    for name, body in SQLITE_TRIGGERS.items():
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+        schema_editor.execute(f'CREATE TRIGGER "{name}" {body}')
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Adding a stored generated column computes it for existing rows
+        schema_editor.execute(
+            f'ALTER TABLE "{TABLE}" ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS ({POSTGRES_DOCUMENT}) STORED'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX "{TABLE}_search_idx" ON "{TABLE}" USING GIN (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE "{FTS_TABLE}" '
+            f"USING fts5(title, description, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO "{FTS_TABLE}" (rowid, title, description) '
+            f'SELECT id, title, description FROM "{TABLE}"'
+        )
+        create_sqlite_triggers(schema_editor)
+
+
+def remove_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Dropping the column drops its index
+        schema_editor.execute(f'ALTER TABLE "{TABLE}" DROP COLUMN search_vector')
+    elif vendor == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+        schema_editor.execute(f'DROP TABLE "{FTS_TABLE}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses_optimized', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
@@ -1,11 +1,19 @@
 """
 Optimized Course Models with Performance Considerations
 """
-from django.db import models
-from django.db.models import F, Count, Avg, Prefetch
+import logging
+import time
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Count, Avg, Prefetch, Case, When, Value, ExpressionWrapper, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
 from django.utils.text import slugify
 from accounts.models import CustomUser
 
+logger = logging.getLogger(__name__)
+
 
 class OptimizedCourseQuerySet(models.QuerySet):
     """Custom QuerySet with optimization methods to avoid N+1 queries."""
@@ -143,7 +151,13 @@ class OptimizedCourse(models.Model):
             )
             for data in courses_data
         ]
-        return cls.objects.bulk_create(courses, batch_size=batch_size)
+        created = cls.objects.bulk_create(courses, batch_size=batch_size)
+        
+        # bulk_create() skips save() and post_save, so invalidate the list
+        # cache here. The database indexes the new rows for search.
+        from .cache import course_list_cache
+        course_list_cache.invalidate()
+        return created
 
 
 class CourseStats(models.Model):
@@ -169,6 +183,8 @@ class CourseStats(models.Model):
     completed_count = models.IntegerField(default=0)
     avg_rating = models.DecimalField(max_digits=3, decimal_places=1, default=0.0)
     total_reviews = models.IntegerField(default=0)
+    # Exact sum of review ratings; avg_rating is derived from it
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     
 
     last_enrollment = models.DateTimeField(null=True, blank=True)
@@ -214,9 +230,256 @@ class CourseStats(models.Model):
         stats.enrolled_count = stats_data['enrolled']
         stats.completed_count = stats_data['completed']
         stats.save(update_fields=['enrolled_count', 'completed_count', 'updated_at'])
+        cls.invalidate_course_lists()
+    
+    @staticmethod
+    def invalidate_course_lists():
+        """
+        Drop cached course lists once the current transaction commits.
+        
+        List responses include enrolled_count, so every write that changes
+        it invalidates them. Review stats are not part of the list.
+        """
+        from .cache import course_list_cache
+        transaction.on_commit(course_list_cache.invalidate)
     
     @classmethod
-    def batch_update_stats(cls, course_ids):
-        """Update stats for multiple courses efficiently."""
+    def batch_update_stats(cls, course_ids, chunk_size=1000):
+        """
+        Recompute enrollment stats for many courses with set-based queries.
+        
+        Per chunk of course ids this runs:
+        - 1 GROUP BY object_id aggregate over Enrollment
+        - 1 SELECT of the existing stats row ids
+        - 1 bulk UPDATE of the existing rows
+        - 1 INSERT ... ON CONFLICT (course_id) DO UPDATE for missing rows
+        
+        instead of a ContentType lookup, aggregate, get_or_create and save
+        per course. Chunking keeps the IN (...) lists within database
+        parameter limits.
+        
+        Args:
+            course_ids: Iterable of OptimizedCourse ids
+            chunk_size: Number of courses per aggregate/upsert round trip
+        
+        Returns:
+            List of per-chunk reports, where `rows` is what the database
+            reported as written (updated + created):
+            {'chunk': 1, 'courses': 1000, 'rows': 1000, 'updated': 990,
+             'created': 10, 'elapsed_ms': 12.3}
+        """
+        course_ids = list(course_ids)
+        reports = []
+        
+        for index in range(0, len(course_ids), chunk_size):
+            chunk = course_ids[index:index + chunk_size]
+            start = time.monotonic()
+            
+            counts = cls.aggregate_enrollments(chunk)
+            existing = dict(
+                cls.objects.filter(course_id__in=chunk).values_list('course_id', 'id')
+            )
+            now = timezone.now()
+            fields = ['enrolled_count', 'completed_count', 'last_updated', 'updated_at']
+            rows = [
+                cls(
+                    id=existing.get(course_id),
+                    course_id=course_id,
+                    enrolled_count=counts.get(course_id, {}).get('enrolled', 0),
+                    completed_count=counts.get(course_id, {}).get('completed', 0),
+                    last_updated=now,
+                    updated_at=now,
+                )
+                for course_id in chunk
+            ]
+            
+            updated = cls.objects.bulk_update(
+                [row for row in rows if row.id is not None], fields
+            )
+            missing = [row for row in rows if row.id is None]
+            if missing:
+                # Upsert in case a stats row appeared since the SELECT above;
+                # either way each of these rows is written exactly once
+                cls.objects.bulk_create(
+                    missing,
+                    update_conflicts=True,
+                    unique_fields=['course'],
+                    update_fields=fields,
+                )
+            
+            report = {
+                'chunk': index // chunk_size + 1,
+                'courses': len(chunk),
+                'rows': updated + len(missing),
+                'updated': updated,
+                'created': len(missing),
+                'elapsed_ms': round((time.monotonic() - start) * 1000, 1),
+            }
+            logger.info(
+                'CourseStats chunk %(chunk)d: %(rows)d rows in %(elapsed_ms).1fms', report
+            )
+            reports.append(report)
+        
+        if reports:
+            cls.invalidate_course_lists()
+        return reports
+    
+    @classmethod
+    def _apply_deltas(cls, course_id, **updates):
+        """
+        Apply an atomic UPDATE to a course's stats row.
+        
+        Every value is an F() expression evaluated by the database, so
+        concurrent events never overwrite each other:
+            UPDATE ... SET enrolled_count = enrolled_count + 1 WHERE course_id = 1
+        
+        The row is created on first use.
+        """
+        rows = cls.objects.filter(course_id=course_id).update(**updates)
+        if rows == 0:
+            cls.objects.get_or_create(course_id=course_id)
+            rows = cls.objects.filter(course_id=course_id).update(**updates)
+        return rows
+    
+    @classmethod
+    def apply_enrollment_event(cls, course_id, enrolled=0, completed=0):
+        """
+        Apply enrollment count deltas for a course.
+        
+        Args:
+            course_id: OptimizedCourse id
+            enrolled: Change in total enrollments (+1 on enroll, -1 on delete)
+            completed: Change in completed enrollments
+        """
+        updates = {}
+        if enrolled:
+            updates['enrolled_count'] = F('enrolled_count') + enrolled
+        if completed:
+            updates['completed_count'] = F('completed_count') + completed
+        if enrolled > 0:
+            updates['last_enrollment'] = timezone.now()
+        if updates:
+            cls._apply_deltas(course_id, **updates)
+            cls.invalidate_course_lists()
+    
+    @classmethod
+    def apply_review_event(cls, course_id, rating, removed=False):
+        """
+        Fold a single review rating into rating_sum, total_reviews and
+        avg_rating in one statement:
+            sum = sum + rating, n = n + 1, avg = (sum + rating) / (n + 1)
+        
+        The average is always derived from the exact sum and count (the
+        right-hand sides read the old row values), so only the stored
+        avg_rating is rounded and no error accumulates across events. The
+        division runs in floating point so SQLite does not truncate it.
+        """
+        avg_field = models.DecimalField(max_digits=3, decimal_places=1)
+        sum_field = models.DecimalField(max_digits=12, decimal_places=2)
+        rating = Value(Decimal(str(rating)), output_field=sum_field)
+        
+        if removed:
+            cls._apply_deltas(
+                course_id,
+                avg_rating=Case(
+                    When(total_reviews__lte=1, then=Value(Decimal('0.0'), output_field=avg_field)),
+                    default=Cast(F('rating_sum') - rating, FloatField()) / (F('total_reviews') - 1),
+                    output_field=avg_field,
+                ),
+                rating_sum=Case(
+                    When(total_reviews__lte=1, then=Value(Decimal('0'), output_field=sum_field)),
+                    default=F('rating_sum') - rating,
+                    output_field=sum_field,
+                ),
+                total_reviews=Case(
+                    When(total_reviews__lte=0, then=Value(0)),
+                    default=F('total_reviews') - 1,
+                ),
+            )
+        else:
+            cls._apply_deltas(
+                course_id,
+                avg_rating=ExpressionWrapper(
+                    Cast(F('rating_sum') + rating, FloatField()) / (F('total_reviews') + 1),
+                    output_field=avg_field,
+                ),
+                rating_sum=F('rating_sum') + rating,
+                total_reviews=F('total_reviews') + 1,
+            )
+    
+    @classmethod
+    def aggregate_enrollments(cls, course_ids):
+        """
+        Count enrollments for many courses in one grouped query.
+        
+        SELECT object_id, COUNT(id), COUNT(id) FILTER (WHERE status = 'completed')
+        FROM enrollments WHERE content_type_id = %s AND object_id IN (...)
+        GROUP BY object_id
+        
+        Returns:
+            Dict of course_id -> {'enrolled': int, 'completed': int}.
+            Courses without enrollments are absent.
+        """
+        from enrollments.models import Enrollment
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models import Q
+        
+        content_type = ContentType.objects.get_for_model(OptimizedCourse)
+        rows = Enrollment.objects.filter(
+            content_type=content_type,
+            object_id__in=course_ids
+        ).values('object_id').annotate(
+            enrolled=Count('id'),
+            completed=Count('id', filter=Q(status='completed'))
+        ).order_by()
+        
+        return {
+            row['object_id']: {'enrolled': row['enrolled'], 'completed': row['completed']}
+            for row in rows
+        }
+    
+    @classmethod
+    def reconcile_stats(cls, course_ids):
+        """
+        Correct drifted enrollment counters for a batch of courses.
+        
+        Uses one grouped aggregate for the whole batch, one query to load
+        the current stats rows, and a single bulk_update() for the rows
+        that actually drifted (plus a bulk_create() for missing rows).
+        
+        Returns:
+            Number of stats rows corrected or created
+        """
+        course_ids = list(course_ids)
+        actual = cls.aggregate_enrollments(course_ids)
+        existing = {
+            stats.course_id: stats
+            for stats in cls.objects.filter(course_id__in=course_ids).only(
+                'id', 'course_id', 'enrolled_count', 'completed_count'
+            )
+        }
+        
+        drifted = []
+        missing = []
         for course_id in course_ids:
-            cls.update_course_stats(course_id)
+            counts = actual.get(course_id, {'enrolled': 0, 'completed': 0})
+            stats = existing.get(course_id)
+            if stats is None:
+                missing.append(cls(
+                    course_id=course_id,
+                    enrolled_count=counts['enrolled'],
+                    completed_count=counts['completed']
+                ))
+            elif (stats.enrolled_count, stats.completed_count) != (counts['enrolled'], counts['completed']):
+                stats.enrolled_count = counts['enrolled']
+                stats.completed_count = counts['completed']
+                stats.updated_at = timezone.now()
+                drifted.append(stats)
+        
+        if drifted:
+            cls.objects.bulk_update(drifted, ['enrolled_count', 'completed_count', 'updated_at'])
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+        if drifted or missing:
+            cls.invalidate_course_lists()
+        return len(drifted) + len(missing)
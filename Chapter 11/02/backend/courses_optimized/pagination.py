@@ -0,0 +1,266 @@
+"""
+Keyset (Cursor) Pagination for the Optimized Course Catalogue
+
+PageNumberPagination runs a COUNT(*) and an OFFSET scan, so page 50,000 of a
+1M-row table reads and throws away 500,000 rows. Keyset pagination remembers
+the sort key of the last row instead and asks for the rows that come after it:
+
+    WHERE status = 'active'
+      AND (created_at < %s OR (created_at = %s AND id < %s))
+    ORDER BY created_at DESC, id DESC
+    LIMIT 11
+
+With the (status, created_at) index this is an index range scan that costs
+the same on every page. Each ordering appends `id` as a tiebreaker so the
+order is total and no row is skipped or repeated between pages.
+
+Both paginators describe their next/previous links as query parameter
+changes (`get_link_params()`) applied to the current request URL, so a
+cached page can be served with links for the host and parameters of the
+request at hand (see `render_cached_page()`).
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import OptimizedCourse
+
+
+def build_page_link(request, params):
+    """
+    Return the absolute URL of the request with query parameters replaced,
+    or removed where the value is None.
+    """
+    url = request.build_absolute_uri()
+    for name, value in params.items():
+        if value is None:
+            url = remove_query_param(url, name)
+        else:
+            url = replace_query_param(url, name, value)
+    return url
+
+
+def render_cached_page(request, cached):
+    """Rebuild a paginated response body stored by the list view."""
+    data = OrderedDict(cached['data'])
+    for name, params in cached['links'].items():
+        data[name] = build_page_link(request, params) if params is not None else None
+    return data
+
+
+class LinkParamsMixin:
+    """Build next/previous links from `get_link_params()`."""
+
+    def get_link_params(self):
+        """Return {'next': params or None, 'previous': params or None}."""
+        raise NotImplementedError
+
+    def get_next_link(self):
+        params = self.get_link_params()['next']
+        return build_page_link(self.request, params) if params is not None else None
+
+    def get_previous_link(self):
+        params = self.get_link_params()['previous']
+        return build_page_link(self.request, params) if params is not None else None
+
+
+class CoursePagination(LinkParamsMixin, PageNumberPagination):
+    """Custom pagination class for courses."""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_link_params(self):
+        next_params = previous_params = None
+        if self.page.has_next():
+            next_params = {self.page_query_param: self.page.next_page_number()}
+        if self.page.has_previous():
+            number = self.page.previous_page_number()
+            # Page 1 is linked without the page parameter
+            previous_params = {self.page_query_param: None if number == 1 else number}
+        return {'next': next_params, 'previous': previous_params}
+
+
+class CourseKeysetPagination(LinkParamsMixin):
+    """
+    Cursor-based pagination over the allowed course orderings.
+
+    Each ordering maps to the column sequence that follows an existing
+    index from OptimizedCourse.Meta.indexes where possible:
+    - created_at: (status, created_at) index
+    - rating: (rating, -enrolled) index
+
+    Query parameters:
+    - pagination=cursor: Enable this mode (implied by `cursor`)
+    - cursor: Opaque position returned in `next` / `previous`
+    - page_size: Results per page (max 100)
+    - count=true: Also return the total (costs a COUNT(*) per page)
+
+    Search results are ranked by relevance, which is not a stable keyset,
+    so `search` needs an explicit `ordering` in this mode.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    mode_query_param = 'pagination'
+
+    # Sort keys per ordering value, as (field, descending) pairs.
+    # `id` always comes last so the ordering is total.
+    orderings = {
+        'created_at': [('created_at', False), ('id', False)],
+        '-created_at': [('created_at', True), ('id', True)],
+        'rating': [('rating', False), ('enrolled', True), ('id', False)],
+        '-rating': [('rating', True), ('enrolled', False), ('id', True)],
+        'price': [('price', False), ('id', False)],
+        '-price': [('price', True), ('id', True)],
+        'enrolled': [('enrolled', False), ('id', False)],
+        '-enrolled': [('enrolled', True), ('id', True)],
+    }
+    default_ordering = '-created_at'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Return True if the request asks for cursor pagination."""
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == 'cursor'
+            or cls.cursor_query_param in params
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get('ordering', self.default_ordering)
+        if ordering not in self.orderings:
+            return self.default_ordering
+        return ordering
+
+    def encode_cursor(self, instance, reverse):
+        """Encode the sort key of an instance as an opaque cursor."""
+        values = [
+            str(getattr(instance, field))
+            for field, _ in self.orderings[self.ordering]
+        ]
+        payload = json.dumps({'o': self.ordering, 'v': values, 'r': reverse})
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        """Decode the cursor parameter into (values, reverse)."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != self.ordering:
+                raise ValueError('Cursor does not match ordering')
+            keys = self.orderings[self.ordering]
+            if len(payload['v']) != len(keys):
+                raise ValueError('Cursor has the wrong number of values')
+            values = [
+                OptimizedCourse._meta.get_field(field).to_python(value)
+                for (field, _), value in zip(keys, payload['v'])
+            ]
+            return values, bool(payload.get('r', False))
+        except Exception:
+            raise NotFound('Invalid cursor')
+
+    def build_filter(self, values, reverse):
+        """
+        Build the lexicographic "comes after" condition for a sort key.
+
+        For keys (a, b, id) this is:
+            a > v1 OR (a = v1 AND b > v2) OR (a = v1 AND b = v2 AND id > v3)
+        with each comparison flipped for descending keys or reverse paging.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for (field, descending), value in zip(self.orderings[self.ordering], values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal_prefix & Q(**{f'{field}__{lookup}': value})
+            equal_prefix &= Q(**{field: value})
+        return condition
+
+    def get_order_by(self, reverse):
+        return [
+            f'-{field}' if descending != reverse else field
+            for field, descending in self.orderings[self.ordering]
+        ]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        if request.query_params.get('search') and not request.query_params.get('ordering'):
+            raise ValidationError({
+                'ordering': 'Cursor pagination of search results needs an explicit ordering; '
+                            'relevance order is only available with page numbers.'
+            })
+
+        values, reverse = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, 'false').lower() == 'true':
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self.build_filter(values, reverse))
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.page = rows
+        return rows
+
+    def get_cursor_params(self, instance, reverse):
+        return {
+            'page': None,
+            'ordering': self.ordering,
+            self.cursor_query_param: self.encode_cursor(instance, reverse),
+        }
+
+    def get_link_params(self):
+        next_params = previous_params = None
+        if self.has_next and self.page:
+            next_params = self.get_cursor_params(self.page[-1], reverse=False)
+        if self.has_previous and self.page:
+            previous_params = self.get_cursor_params(self.page[0], reverse=True)
+        return {'next': next_params, 'previous': previous_params}
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
@@ -0,0 +1,151 @@
+"""
+Pluggable Full-Text Search Backends for Optimized Courses
+
+`Q(title__icontains=...) | Q(description__icontains=...)` compiles to
+`LIKE '%x%'`, which cannot use any index and scans every description.
+These backends query a precomputed search index next to OptimizedCourse
+instead, so search cost follows the number of matches rather than the
+size of the catalogue. The index is created by migration 0002_search_index
+and maintained by the database itself, so saves, bulk creates, raw
+updates and deletes all keep it current without application code:
+
+- PostgresSearchBackend: weighted tsvector column with a GIN index,
+  ranked with ts_rank()
+- SQLiteSearchBackend: FTS5 virtual table keyed by course id, ranked
+  with bm25(), so the feature stays testable on a local SQLite database
+- BasicSearchBackend: the original icontains filter, for other databases
+
+The backend is chosen from the database vendor, or explicitly with the
+COURSES_OPTIMIZED_SEARCH_BACKEND setting (a dotted path to a class).
+
+Every backend exposes the same API:
+    search(qs, query)  Filter a queryset and annotate `search_rank`
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import OptimizedCourse
+
+
+class BaseSearchBackend:
+    """Common interface for course search backends."""
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def table(self):
+        return self.connection.ops.quote_name(OptimizedCourse._meta.db_table)
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Unindexed LIKE '%x%' fallback; rank is constant."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query)
+        ).annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Stored generated tsvector column on the course table, GIN indexed.
+
+    Titles are weighted 'A' and descriptions 'B', so title matches rank
+    higher. The column is not a model field, so the model stays portable
+    across databases.
+    """
+
+    config = 'english'
+
+    def search(self, queryset, query):
+        tsquery = f"websearch_to_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            RawSQL(f'search_vector @@ {tsquery}', [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'ts_rank(search_vector, {tsquery})', [query], output_field=FloatField()
+            )
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    FTS5 virtual table whose rowid is the course id.
+
+    Triggers on the course table copy title and description into it on
+    every insert, update and delete.
+    """
+
+    title_weight = 10.0
+
+    @property
+    def fts_table(self):
+        return self.connection.ops.quote_name(
+            f'{OptimizedCourse._meta.db_table}_fts'
+        )
+
+    @staticmethod
+    def to_match_expression(query):
+        """
+        Turn free text into a safe FTS5 MATCH expression.
+
+        Each word is quoted so user input cannot inject FTS5 operators,
+        and the last word matches as a prefix for search-as-you-type.
+        """
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = ['"{}"'.format(word.replace('"', '""')) for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, queryset, query):
+        expression = self.to_match_expression(query)
+        if expression is None:
+            # Still annotated, so callers can order by search_rank
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        matches = f'SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s'
+        # bm25() is lower for better matches, so negate it for search_rank.
+        # The weights rank title matches above description matches.
+        rank = (
+            f'SELECT -bm25({self.fts_table}, {self.title_weight}, 1.0) FROM {self.fts_table} '
+            f'WHERE {self.fts_table} MATCH %s AND rowid = {self.table}.id'
+        )
+        return queryset.filter(
+            id__in=RawSQL(matches, [expression])
+        ).annotate(
+            search_rank=RawSQL(rank, [expression], output_field=FloatField())
+        )
+
+
+VENDOR_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(using='default'):
+    """Return the configured search backend for a database alias."""
+    path = getattr(settings, 'COURSES_OPTIMIZED_SEARCH_BACKEND', None)
+    if path:
+        backend_class = import_string(path)
+    else:
+        vendor = connections[using].vendor
+        backend_class = VENDOR_BACKENDS.get(vendor, BasicSearchBackend)
+    return backend_class(using=using)
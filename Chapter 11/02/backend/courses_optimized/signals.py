@@ -0,0 +1,68 @@
+"""
+Signal handlers for the optimized courses app.
+
+Enrollment events are folded into CourseStats as atomic F() deltas instead
+of re-aggregating every enrollment of the course on each change.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from enrollments.models import Enrollment
+
+from .cache import course_list_cache
+from .models import OptimizedCourse, CourseStats
+
+
+@receiver(post_save, sender=OptimizedCourse)
+@receiver(post_delete, sender=OptimizedCourse)
+def invalidate_course_list_cache(sender, **kwargs):
+    """Bump the course list version on any create, update or delete."""
+    course_list_cache.invalidate()
+
+
+def _is_course_enrollment(enrollment):
+    """ContentType lookups are cached by Django, so this costs no query."""
+    content_type = ContentType.objects.get_for_model(OptimizedCourse)
+    return enrollment.content_type_id == content_type.id
+
+
+@receiver(post_init, sender=Enrollment)
+def remember_enrollment_status(sender, instance, **kwargs):
+    """Keep the loaded status so post_save can detect completion changes."""
+    # Read from __dict__ so a deferred status field is not fetched
+    instance._stats_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    if not _is_course_enrollment(instance):
+        return
+
+    is_completed = instance.status == 'completed'
+    if created:
+        CourseStats.apply_enrollment_event(
+            instance.object_id,
+            enrolled=1,
+            completed=1 if is_completed else 0
+        )
+    else:
+        was_completed = instance._stats_status == 'completed'
+        if was_completed != is_completed:
+            CourseStats.apply_enrollment_event(
+                instance.object_id,
+                completed=1 if is_completed else -1
+            )
+    instance._stats_status = instance.status
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    if not _is_course_enrollment(instance):
+        return
+
+    CourseStats.apply_enrollment_event(
+        instance.object_id,
+        enrolled=-1,
+        completed=-1 if instance._stats_status == 'completed' else 0
+    )
@@ -19,9 +19,15 @@ from django.db import connection
 from django.db.models import Count, Avg, Q
 from django.test.utils import CaptureQueriesContext
 from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
 
 from accounts.models import CustomUser
+from .cache import course_list_cache
+from .pagination import CourseKeysetPagination
+from .search import get_search_backend
 from .models import OptimizedCourse, CourseStats
+from .views import OptimizedCourseCacheMetricsView, OptimizedCourseListView
 
 
 def load_tests(loader, tests, pattern):
@@ -279,6 +285,136 @@ class OptimizedCoursesPaginationTests(PerformanceTestCase):
         print(f"\n❌ Unpaginated query: {len(ctx.captured_queries)} query (NO LIMIT)")
 
 
+class OptimizedCoursesKeysetPaginationTests(PerformanceTestCase):
+    """Tests for cursor (keyset) pagination."""
+    
+    def paginate(self, url):
+        request = Request(APIRequestFactory().get(url))
+        paginator = CourseKeysetPagination()
+        queryset = OptimizedCourse.objects.filter(status='active')
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, page
+    
+    def walk(self, ordering):
+        """Follow `next` links through every page, returning ids in order."""
+        ids = []
+        url = f'/api/courses-optimized/?pagination=cursor&page_size=7&ordering={ordering}&count=false'
+        while url:
+            paginator, page = self.paginate(url)
+            ids.extend(course.id for course in page)
+            url = paginator.get_next_link()
+        return ids
+    
+    def test_pages_follow_stable_total_order(self):
+        """
+        Every allowed ordering visits each row exactly once, in order,
+        even when many rows share the same sort value.
+        """
+        active = OptimizedCourse.objects.filter(status='active')
+        for ordering, keys in CourseKeysetPagination.orderings.items():
+            expected = list(active.order_by(
+                *[f'-{field}' if desc else field for field, desc in keys]
+            ).values_list('id', flat=True))
+            self.assertEqual(self.walk(ordering), expected, ordering)
+    
+    def test_page_fetch_is_single_query_without_count(self):
+        """
+        Deep pages cost one LIMIT query: no COUNT(*) and no OFFSET.
+        """
+        paginator, _ = self.paginate('/?pagination=cursor&page_size=10&count=false')
+        for _ in range(5):
+            next_url = paginator.get_next_link()
+            with CaptureQueriesContext(connection) as ctx:
+                paginator, page = self.paginate(next_url)
+            self.assertEqual(len(ctx.captured_queries), 1)
+            self.assertNotIn('OFFSET', ctx.captured_queries[0]['sql'].upper())
+    
+    def test_count_only_when_requested(self):
+        with CaptureQueriesContext(connection) as ctx:
+            paginator, _ = self.paginate('/?pagination=cursor')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('count', paginator.get_paginated_response([]).data)
+        
+        paginator, _ = self.paginate('/?pagination=cursor&count=true')
+        data = paginator.get_paginated_response([]).data
+        self.assertEqual(data['count'], OptimizedCourse.objects.filter(status='active').count())
+    
+    def test_search_requires_explicit_ordering(self):
+        """Relevance order cannot be paged by cursor, so it is rejected."""
+        from rest_framework.exceptions import ValidationError
+        with self.assertRaises(ValidationError):
+            self.paginate('/?pagination=cursor&search=python')
+        
+        paginator, _ = self.paginate('/?pagination=cursor&search=python&ordering=-created_at')
+        self.assertEqual(paginator.ordering, '-created_at')
+    
+    def test_previous_link_returns_prior_page(self):
+        first_paginator, first_page = self.paginate('/?pagination=cursor&page_size=5')
+        second_paginator, _ = self.paginate(first_paginator.get_next_link())
+        _, previous_page = self.paginate(second_paginator.get_previous_link())
+        self.assertEqual(
+            [course.id for course in previous_page],
+            [course.id for course in first_page]
+        )
+
+
+class OptimizedCoursesSearchBackendTests(PerformanceTestCase):
+    """Tests for the indexed full-text search backend."""
+    
+    def setUp(self):
+        self.backend = get_search_backend()
+        self.title_match, self.description_match = OptimizedCourse.bulk_create_optimized([
+            {
+                'title': 'Advanced Python Patterns',
+                'description': 'Design patterns for large codebases',
+                'instructor_id': self.instructors[0].id,
+                'price': 49.99,
+                'status': 'active',
+            },
+            {
+                'title': 'Data Engineering',
+                'description': 'Pipelines written in python with Airflow',
+                'instructor_id': self.instructors[1].id,
+                'price': 59.99,
+                'status': 'active',
+            },
+        ])
+    
+    def search_ids(self, query):
+        results = self.backend.search(OptimizedCourse.objects.all(), query)
+        return list(results.order_by('-search_rank').values_list('id', flat=True))
+    
+    def test_bulk_created_courses_are_indexed_and_ranked(self):
+        """Title matches rank above description-only matches."""
+        self.assertEqual(
+            self.search_ids('python'),
+            [self.title_match.id, self.description_match.id]
+        )
+    
+    def test_save_refreshes_index(self):
+        self.description_match.description = 'Pipelines written in Scala'
+        self.description_match.save()
+        
+        self.assertEqual(self.search_ids('python'), [self.title_match.id])
+        self.assertEqual(self.search_ids('scala'), [self.description_match.id])
+    
+    def test_queryset_update_refreshes_index(self):
+        """The database maintains the index, so update() bypassing save() is covered."""
+        OptimizedCourse.objects.filter(id=self.title_match.id).update(title='Advanced Rust Patterns')
+        
+        self.assertEqual(self.search_ids('python'), [self.description_match.id])
+        self.assertEqual(self.search_ids('rust'), [self.title_match.id])
+    
+    def test_delete_removes_from_index(self):
+        self.title_match.delete()
+        self.assertEqual(self.search_ids('python'), [self.description_match.id])
+    
+    def test_query_syntax_is_escaped(self):
+        """User input cannot break the full-text query syntax."""
+        self.assertEqual(self.search_ids('"python ('), [self.title_match.id, self.description_match.id])
+        self.assertEqual(self.search_ids('()'), [])
+
+
 class OptimizedCoursesAggregationTests(PerformanceTestCase):
     """Tests demonstrating efficient aggregation."""
     
@@ -324,6 +460,99 @@ class OptimizedCoursesAggregationTests(PerformanceTestCase):
         print(f"\n✅ Multi-aggregate: {len(ctx.captured_queries)} query for 3 aggregates")
 
 
+class CourseStatsIncrementalTests(PerformanceTestCase):
+    """Tests for event-driven CourseStats maintenance."""
+    
+    def test_enrollment_event_is_single_update(self):
+        """
+        An enrollment event is one UPDATE with F() deltas, not a recount.
+        """
+        course = self.courses[1]
+        with CaptureQueriesContext(connection) as ctx:
+            CourseStats.apply_enrollment_event(course.id, enrolled=1, completed=1)
+        
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertTrue(ctx.captured_queries[0]['sql'].upper().startswith('UPDATE'))
+        stats = CourseStats.objects.get(course=course)
+        self.assertEqual(stats.enrolled_count, 1)
+        self.assertEqual(stats.completed_count, 1)
+        self.assertIsNotNone(stats.last_enrollment)
+    
+    def test_review_events_maintain_running_average(self):
+        course = self.courses[2]
+        CourseStats.apply_review_event(course.id, 5)
+        CourseStats.apply_review_event(course.id, 4)
+        
+        stats = CourseStats.objects.get(course=course)
+        self.assertEqual(stats.total_reviews, 2)
+        self.assertEqual(float(stats.avg_rating), 4.5)
+        
+        CourseStats.apply_review_event(course.id, 4, removed=True)
+        stats.refresh_from_db()
+        self.assertEqual(stats.total_reviews, 1)
+        self.assertEqual(float(stats.avg_rating), 5.0)
+    
+    def test_review_average_does_not_drift(self):
+        """The average comes from the exact sum, so rounding never compounds."""
+        course = self.courses[3]
+        ratings = [5, 4, 4, 3, 5, 4, 4, 5, 3, 4] * 10
+        for rating in ratings:
+            CourseStats.apply_review_event(course.id, rating)
+        
+        stats = CourseStats.objects.get(course=course)
+        self.assertEqual(stats.total_reviews, len(ratings))
+        self.assertEqual(float(stats.rating_sum), sum(ratings))
+        self.assertEqual(float(stats.avg_rating), round(sum(ratings) / len(ratings), 1))
+    
+    def test_reconcile_fixes_drift_in_one_batch(self):
+        """
+        Drifted rows are corrected with a constant number of queries
+        regardless of batch size.
+        """
+        drifted = self.courses[3:8]
+        CourseStats.objects.filter(course__in=drifted).update(enrolled_count=42)
+        course_ids = [course.id for course in self.courses]
+        
+        with CaptureQueriesContext(connection) as ctx:
+            corrected = CourseStats.reconcile_stats(course_ids)
+        
+        self.assertEqual(corrected, len(drifted))
+        # contenttype, aggregate, load, bulk_update (+ savepoint statements)
+        self.assertLessEqual(len(ctx.captured_queries), 6)
+        self.assertFalse(CourseStats.objects.filter(enrolled_count=42).exists())
+
+
+class CourseStatsBulkRecomputeTests(PerformanceTestCase):
+    """Tests for set-based CourseStats.batch_update_stats."""
+    
+    def test_query_count_is_per_chunk_not_per_course(self):
+        """
+        Recomputing 100 courses in chunks of 50 costs a constant number
+        of statements per chunk instead of 3+ per course.
+        """
+        CourseStats.objects.update(enrolled_count=7, completed_count=3)
+        course_ids = [course.id for course in self.courses]
+        
+        with CaptureQueriesContext(connection) as ctx:
+            reports = CourseStats.batch_update_stats(course_ids, chunk_size=50)
+        
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(sum(report['rows'] for report in reports), len(course_ids))
+        self.assertEqual(sum(report['updated'] for report in reports), len(course_ids))
+        self.assertTrue(all('elapsed_ms' in report for report in reports))
+        # contenttype + (aggregate + select + bulk update, with savepoints) per chunk
+        self.assertLess(len(ctx.captured_queries), 15)
+        self.assertEqual(CourseStats.objects.filter(enrolled_count=0, completed_count=0).count(), 100)
+    
+    def test_creates_missing_rows(self):
+        CourseStats.objects.filter(course=self.courses[0]).delete()
+        reports = CourseStats.batch_update_stats([self.courses[0].id, self.courses[1].id])
+        self.assertTrue(CourseStats.objects.filter(course=self.courses[0]).exists())
+        self.assertEqual(reports[0]['created'], 1)
+        self.assertEqual(reports[0]['updated'], 1)
+        self.assertEqual(reports[0]['rows'], 2)
+
+
 class OptimizedCoursesCachingTests(PerformanceTestCase):
     """Tests demonstrating caching benefits."""
     
@@ -355,6 +584,132 @@ class OptimizedCoursesCachingTests(PerformanceTestCase):
         print(f"\n✅ Cache benefits: {first_queries} queries → {second_queries} queries")
 
 
+class OptimizedCoursesVersionedCacheTests(PerformanceTestCase):
+    """Tests for query-aware, versioned list cache keys."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_query_variants_use_distinct_keys(self):
+        """
+        Different search/ordering/page_size values must not share an entry.
+        """
+        base = course_list_cache.make_key({'page': '2'})
+        self.assertNotEqual(base, course_list_cache.make_key({'page': '2', 'search': 'python'}))
+        self.assertNotEqual(base, course_list_cache.make_key({'page': '2', 'ordering': 'price'}))
+        self.assertNotEqual(base, course_list_cache.make_key({'page': '2', 'page_size': '50'}))
+        self.assertNotEqual(base, course_list_cache.make_key({'page': '2', 'instructor_id': '1'}))
+    
+    def test_equivalent_queries_share_key(self):
+        """Defaults, blanks and unknown parameters normalize to one key."""
+        self.assertEqual(
+            course_list_cache.make_key({}),
+            course_list_cache.make_key({'page': '1', 'ordering': '-created_at', 'search': ' ', 'utm': 'x'})
+        )
+    
+    def test_search_ordering_default_is_relevance(self):
+        """
+        A search without ordering is ranked by relevance, so it must not
+        share an entry with the same search ordered by creation date.
+        """
+        self.assertNotEqual(
+            course_list_cache.make_key({'search': 'python'}),
+            course_list_cache.make_key({'search': 'python', 'ordering': '-created_at'})
+        )
+    
+    def test_write_invalidates_every_variant(self):
+        """
+        Saving a course bumps the version, so all cached variants miss.
+        """
+        variants = [
+            {'page': str(page), 'search': search}
+            for page in range(1, 4)
+            for search in ('', 'python')
+        ]
+        for params in variants:
+            course_list_cache.set(course_list_cache.make_key(params), {'results': []})
+        
+        course = self.courses[1]
+        course.title = 'Renamed Course'
+        course.save()
+        
+        for params in variants:
+            self.assertIsNone(course_list_cache.get(course_list_cache.make_key(params)))
+    
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_cached_page_links_follow_request(self):
+        """
+        Cached pages rebuild next/previous for the current host and
+        query string instead of replaying the first request's links.
+        """
+        view = OptimizedCourseListView.as_view()
+        factory = APIRequestFactory()
+        first = view(factory.get('/api/courses-optimized/', {'page': '2'}, HTTP_HOST='a.example.com'))
+        self.assertEqual(first.data['next'], 'http://a.example.com/api/courses-optimized/?page=3')
+        self.assertEqual(first.data['previous'], 'http://a.example.com/api/courses-optimized/')
+        
+        with CaptureQueriesContext(connection) as ctx:
+            second = view(factory.get(
+                '/api/courses-optimized/', {'page': '2', 'utm': 'mail'}, HTTP_HOST='b.example.com'
+            ))
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(second.data['results'], first.data['results'])
+        self.assertEqual(second.data['next'], 'http://b.example.com/api/courses-optimized/?page=3&utm=mail')
+        self.assertEqual(second.data['previous'], 'http://b.example.com/api/courses-optimized/?utm=mail')
+    
+    def test_enrollment_stats_writes_invalidate_after_commit(self):
+        """
+        Lists show enrolled_count, so F() deltas and reconcile writes
+        invalidate them once their transaction commits.
+        """
+        course = self.courses[1]
+        params = {'page': '1'}
+        course_list_cache.set(course_list_cache.make_key(params), {'results': []})
+        
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            CourseStats.apply_enrollment_event(course.id, enrolled=1)
+            self.assertIsNotNone(course_list_cache.get(course_list_cache.make_key(params)))
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(course_list_cache.get(course_list_cache.make_key(params)))
+        
+        course_list_cache.set(course_list_cache.make_key(params), {'results': []})
+        with self.captureOnCommitCallbacks(execute=True):
+            CourseStats.reconcile_stats([course.id])
+        self.assertIsNone(course_list_cache.get(course_list_cache.make_key(params)))
+    
+    def test_review_events_keep_lists_cached(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            CourseStats.apply_review_event(self.courses[1].id, 5)
+        self.assertEqual(callbacks, [])
+    
+    def test_hit_and_miss_counters(self):
+        """Hits and misses are counted for scraping."""
+        key = course_list_cache.make_key({'page': '1'})
+        course_list_cache.get(key)
+        course_list_cache.set(key, {'results': []})
+        course_list_cache.get(key)
+        
+        metrics = course_list_cache.metrics()
+        self.assertEqual(metrics['hits'], 1)
+        self.assertEqual(metrics['misses'], 1)
+        self.assertEqual(metrics['hit_ratio'], 0.5)
+    
+    def test_metrics_are_admin_only(self):
+        view = OptimizedCourseCacheMetricsView.as_view()
+        request = APIRequestFactory().get('/api/courses-optimized/cache-metrics/')
+        force_authenticate(request, user=self.instructors[0])
+        self.assertEqual(view(request).status_code, 403)
+        
+        admin = CustomUser.objects.create_superuser(
+            email='admin@test.com', name='Admin', password='testpass123'
+        )
+        request = APIRequestFactory().get('/api/courses-optimized/cache-metrics/')
+        force_authenticate(request, user=admin)
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_ratio', response.data)
+
+
 class PerformanceComparisonTests(PerformanceTestCase):
     """Direct performance comparisons."""
     
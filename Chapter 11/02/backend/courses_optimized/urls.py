@@ -3,7 +3,8 @@ from django.urls import path
 from .views import (
     OptimizedCourseListView,
     OptimizedCourseDetailView,
-    OptimizedCourseStatsView
+    OptimizedCourseStatsView,
+    OptimizedCourseCacheMetricsView
 )
 
 app_name = 'courses_optimized'
@@ -17,4 +18,6 @@ urlpatterns = [
     
  
     path('<int:course_id>/stats/', OptimizedCourseStatsView.as_view(), name='course-stats'),
+    
+    path('cache-metrics/', OptimizedCourseCacheMetricsView.as_view(), name='cache-metrics'),
 ]
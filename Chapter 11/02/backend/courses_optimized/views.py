@@ -6,15 +6,15 @@ Optimized Views with Performance Considerations
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from django.core.cache import cache
-from django.db.models import Q, F
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from .cache import course_list_cache
 from .models import OptimizedCourse, CourseStats
+from .pagination import CourseKeysetPagination, CoursePagination, render_cached_page
+from .search import get_search_backend
 from .serializers import (
     OptimizedCourseSerializer,
     OptimizedCourseListSerializer,
@@ -22,13 +22,6 @@ from .serializers import (
 )
 
 
-class CoursePagination(PageNumberPagination):
-    """Custom pagination class for courses."""
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
 class OptimizedCourseListView(APIView):
     """
     List and Create Optimized Courses with Performance Optimization
@@ -37,7 +30,8 @@ class OptimizedCourseListView(APIView):
     - Returns paginated list of active courses
     - Uses select_related and prefetch_related to avoid N+1 queries
     - Implements pagination to handle large datasets
-    - Includes caching for frequently accessed data
+    - ?pagination=cursor switches to keyset pagination for deep pages
+    - Caches each query variant under a versioned key (see cache.py)
     
     POST /api/courses-optimized/
     - Creates a new course (instructor only)
@@ -58,12 +52,13 @@ class OptimizedCourseListView(APIView):
         - select_related('instructor'): Prevents N+1 on instructor
         - prefetch_related('stats'): Prevents N+1 on stats
         - filter(status='active'): Indexed field for fast filtering
+        - search: full-text index lookup ranked by relevance (see search.py)
         """
 
-        cache_key = f"courses_list_page_{request.GET.get('page', 1)}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
+        cache_key = course_list_cache.make_key(request.query_params)
+        cached_page = course_list_cache.get(cache_key)
+        if cached_page is not None:
+            return Response(render_cached_page(request, cached_page))
         
 
         queryset = OptimizedCourse.objects.optimized().filter(status='active')
@@ -80,17 +75,22 @@ class OptimizedCourseListView(APIView):
 
         search_query = request.query_params.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) | 
-                Q(description__icontains=search_query)
-            )
+            queryset = get_search_backend().search(queryset, search_query)
         
 
-        ordering = request.query_params.get('ordering', '-created_at')
-        queryset = queryset.order_by(ordering)
+        ordering = request.query_params.get('ordering')
+        if ordering:
+            queryset = queryset.order_by(ordering)
+        elif search_query:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        else:
+            queryset = queryset.order_by('-created_at')
         
 
-        paginator = self.pagination_class()
+        if CourseKeysetPagination.is_requested(request):
+            paginator = CourseKeysetPagination()
+        else:
+            paginator = self.pagination_class()
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
@@ -101,8 +101,12 @@ class OptimizedCourseListView(APIView):
             )
             result = paginator.get_paginated_response(serializer.data)
             
-   
-            cache.set(cache_key, result.data, 300)  
+            # Links are absolute URLs of this request, so cache how to
+            # build them rather than the links themselves
+            course_list_cache.set(cache_key, {
+                'data': {**result.data, 'next': None, 'previous': None},
+                'links': paginator.get_link_params(),
+            })
             
             return result
         
@@ -134,9 +138,6 @@ class OptimizedCourseListView(APIView):
  
             CourseStats.objects.create(course=course)
             
-  
-            cache.delete_many([f"courses_list_page_{i}" for i in range(1, 11)])
-            
             return Response(
                 OptimizedCourseDetailSerializer(course, context={'request': request}).data,
                 status=status.HTTP_201_CREATED
@@ -252,3 +253,18 @@ class OptimizedCourseStatsView(APIView):
         from .serializers import CourseStatsSerializer
         serializer = CourseStatsSerializer(stats)
         return Response(serializer.data)
+
+
+class OptimizedCourseCacheMetricsView(APIView):
+    """
+    Expose course list cache counters to admins.
+    
+    GET /api/courses-optimized/cache-metrics/
+    - Returns hits, misses, hit ratio and the current collection version
+    """
+    
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Get course list cache metrics."""
+        return Response(course_list_cache.metrics())
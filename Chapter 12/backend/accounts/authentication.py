@@ -0,0 +1,190 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's JWTAuthentication loads the user row on every request. Tokens
+issued by `issue_tokens()` carry the claims our views actually read, so
+StatelessJWTAuthentication builds a UserPrincipal from the signed token
+instead and runs no query:
+
+    user_id, role, name, email, is_active   identity and role checks
+    is_staff, is_superuser                  admin and permission checks
+    auth_time                               when the user logged in
+    sid                                     login session id
+
+Access tokens minted by the refresh endpoint copy these claims from the
+refresh token, so both carry the same auth_time and sid.
+
+Claims are only as fresh as the token, so changes that must take effect
+before it expires go through the revocation list in the cache:
+
+- `revoke_session(sid)` on logout rejects every token of that login
+- `revoke_user(user_id)` on password changes, privilege changes (role,
+  status, staff flags) and deletion rejects every token issued to the
+  user up to now
+
+Profile edits (name, email) revoke nothing; the editing session gets a
+re-issued token pair with the new claims, see `update_token_claims()`.
+
+Each request costs one cache get_many for the revocation check. Tokens
+without the claims (issued before this change) fall back to the DB lookup.
+Views that need the full model use FullUserMixin or `get_full_user()`.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .principals import UserPrincipal
+
+PRINCIPAL_CLAIMS = ('role', 'name', 'email', 'is_active', 'is_staff', 'is_superuser')
+# Claims that grant or withdraw access; changing one revokes earlier tokens
+PRIVILEGE_CLAIMS = ('role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def token_claims(user):
+    """The user fields embedded in issued tokens."""
+    return {claim: getattr(user, claim) for claim in PRINCIPAL_CLAIMS}
+
+
+def issue_tokens(user, sid=None):
+    """
+    Return a RefreshToken (and through it, access tokens) with principal claims.
+
+    Pass `sid` to re-issue tokens for an existing login session, so logging
+    out still revokes them together with the session's earlier tokens.
+    """
+    refresh = RefreshToken.for_user(user)
+    for claim, value in token_claims(user).items():
+        refresh[claim] = value
+    # Sub-second precision, so tokens issued right after a revocation
+    # (for example by a password change) are not caught by it
+    refresh['auth_time'] = time.time()
+    refresh['sid'] = sid or refresh[api_settings.JTI_CLAIM]
+    return refresh
+
+
+def _revocation_ttl():
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def session_revocation_key(sid):
+    return f'auth:revoked:session:{sid}'
+
+
+def user_revocation_key(user_id):
+    return f'auth:revoked:user:{user_id}'
+
+
+def revoke_session(sid):
+    """Reject every token of one login (logout)."""
+    cache.set(session_revocation_key(sid), True, _revocation_ttl())
+
+
+def revoke_user(user_id):
+    """Reject every token issued to a user so far."""
+    cache.set(user_revocation_key(user_id), time.time(), _revocation_ttl())
+
+
+def _revocation_keys(validated_token):
+    keys = [user_revocation_key(validated_token[api_settings.USER_ID_CLAIM])]
+    if 'sid' in validated_token:
+        keys.append(session_revocation_key(validated_token['sid']))
+    return keys
+
+
+def _check_revoked(validated_token, keys, revoked):
+    if len(keys) > 1 and revoked.get(keys[1]):
+        return True
+    revoked_at = revoked.get(keys[0])
+    # Tokens issued before auth_time existed are dated by their iat
+    issued_at = validated_token.get('auth_time', validated_token.get('iat'))
+    return revoked_at is not None and (issued_at is None or issued_at <= revoked_at)
+
+
+def is_revoked(validated_token):
+    keys = _revocation_keys(validated_token)
+    return _check_revoked(validated_token, keys, cache.get_many(keys))
+
+
+async def ais_revoked(validated_token):
+    """is_revoked() for async code such as websocket middleware."""
+    keys = _revocation_keys(validated_token)
+    return _check_revoked(validated_token, keys, await cache.aget_many(keys))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users from token claims, not the DB."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = PRINCIPAL_CLAIMS + ('auth_time', 'sid')
+        if any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return UserPrincipal(
+            id=get_user_model()._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM]),
+            email=validated_token['email'],
+            name=validated_token['name'],
+            role=validated_token['role'],
+            is_staff=validated_token['is_staff'],
+            is_superuser=validated_token['is_superuser'],
+            is_active=validated_token['is_active'],
+        )
+
+
+def update_token_claims(request, user, previous_claims):
+    """
+    Apply an edit of `user` to issued tokens.
+
+    `previous_claims` is `token_claims(user)` from before the edit. A
+    privilege change revokes every token of the user. When the caller
+    edited their own claims, returns a re-issued {'refresh', 'access'} pair
+    for the current session so it sees the new values; otherwise None.
+    """
+    claims = token_claims(user)
+    changed = {claim for claim in PRINCIPAL_CLAIMS if claims[claim] != previous_claims[claim]}
+    if not changed:
+        return None
+    if changed.intersection(PRIVILEGE_CLAIMS):
+        revoke_user(user.pk)
+
+    if request.auth is None or request.user.pk != user.pk or not user.is_active:
+        return None
+    refresh = issue_tokens(user, sid=request.auth.get('sid'))
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+def get_full_user(request):
+    """
+    Return the user model instance for a request, loading it once when the
+    request was authenticated statelessly.
+    """
+    user = request.user
+    if isinstance(user, UserPrincipal):
+        try:
+            user = user.get_user()
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        request.user = user
+    return user
+
+
+class FullUserMixin:
+    """For views that read or write the full user model from request.user."""
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        if request.user.is_authenticated:
+            get_full_user(request)
@@ -1,36 +1,32 @@
 import logging
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.core.cache import cache
-from django.conf import settings
+
+from .throttling import get_client_ip, login_limiter
 
 logger = logging.getLogger('auth')
 
 class CustomAuthBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         User = get_user_model()
-        email = username 
-        
-        
-        lockout_key = f'login_attempts_{email}'
-        attempts = cache.get(lockout_key, 0)
-        
-        if attempts >= settings.MAX_LOGIN_ATTEMPTS:
-            logger.warning(f'Account locked due to multiple failed attempts: {email}')
+        email = username
+        if email is None or password is None:
+            return None
+
+        # Rejected attempts stop here, before any query or password hash
+        ip = get_client_ip(request)
+        if not login_limiter.acquire(email, ip):
+            logger.warning(f'Login attempt blocked by rate limit: {email} from {ip}')
             return None
-            
+
         try:
             user = User.objects.get(email=email)
             if user.check_password(password):
-   
-                cache.delete(lockout_key)
+                login_limiter.succeeded(email, ip)
                 logger.info(f'Successful login: {email}')
                 return user
             else:
-               
-                attempts += 1
-                cache.set(lockout_key, attempts, settings.LOCKOUT_TIME)
-                logger.warning(f'Failed login attempt {attempts} for user: {email}')
+                logger.warning(f'Failed login attempt for user: {email}')
                 return None
         except User.DoesNotExist:
             logger.warning(f'Login attempt for non-existent user: {email}')
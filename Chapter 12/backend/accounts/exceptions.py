@@ -0,0 +1,48 @@
+"""
+HTTP translation of errors raised below the view layer.
+
+HashingPoolSaturated comes from the model layer and is a plain exception,
+so management commands and other non-HTTP callers see it as such. DRF views
+turn it into a 503 through `exception_handler` (REST_FRAMEWORK
+EXCEPTION_HANDLER), other Django views such as the admin login through
+`HashingPoolSaturatedMiddleware`; both send Retry-After.
+"""
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .hashing import HashingPoolSaturated
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The service is busy, please retry shortly.'
+    default_code = 'hashing_unavailable'
+    # Sent as Retry-After by DRF's exception handler
+    wait = HashingPoolSaturated.retry_after
+
+
+def exception_handler(exc, context):
+    if isinstance(exc, HashingPoolSaturated):
+        exc = HashingUnavailable()
+    return drf_exception_handler(exc, context)
+
+
+class HashingPoolSaturatedMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingPoolSaturated):
+            return None
+        response = HttpResponse(
+            HashingUnavailable.default_detail,
+            status=HashingUnavailable.status_code,
+            content_type='text/plain',
+        )
+        response['Retry-After'] = str(exception.retry_after)
+        return response
@@ -0,0 +1,158 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+from .metrics import incr_counter, read_counters, reset_counters
+
+logger = logging.getLogger('auth')
+
+
+class HashingPoolSaturated(Exception):
+    """
+    The hashing pool shed a job. Raised from CustomUser.set_password and
+    check_password, so it is not tied to HTTP; accounts.exceptions turns it
+    into a 503 with Retry-After for API and Django views.
+    """
+    # Seconds a client should wait before retrying
+    retry_after = 1
+
+
+class HashingPool:
+    """
+    Bounded worker pool for password hashing.
+
+    Password hashing (PBKDF2 by default) is the most CPU-expensive work in
+    the accounts API. Running it in a fixed pool of PASSWORD_HASHING_WORKERS
+    threads caps how many cores hashing can take from the other requests
+    served by the same process; hashlib releases the GIL while it works.
+
+    At most PASSWORD_HASHING_QUEUE jobs wait for a worker. Beyond that, and
+    for jobs not finished within PASSWORD_HASHING_TIMEOUT seconds, the
+    request is shed with HashingPoolSaturated (503 with Retry-After) instead
+    of piling up behind the burst.
+
+    Submitted, shed and timed out jobs are counted in shared cache counters
+    across all workers; in_flight is this process's pool. See `stats()`.
+    """
+
+    stats_namespace = 'password_hashing'
+    stat_names = ('submitted', 'shed', 'timed_out')
+
+    def __init__(self, max_workers=None, max_queue=None, timeout=None):
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._timeout = timeout
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self):
+        if self._max_workers is not None:
+            return self._max_workers
+        return getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1
+
+    @property
+    def max_queue(self):
+        if self._max_queue is not None:
+            return self._max_queue
+        return getattr(settings, 'PASSWORD_HASHING_QUEUE', self.max_workers * 4)
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 5)
+
+    def _ensure_started(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='password-hasher'
+                    )
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and return its result, or shed the request."""
+        self._ensure_started()
+        with self._lock:
+            saturated = self._in_flight >= self.max_workers + self.max_queue
+            if not saturated:
+                self._in_flight += 1
+        incr_counter(self.stats_namespace, 'shed' if saturated else 'submitted')
+        if saturated:
+            logger.warning('Password hashing pool saturated, shedding request')
+            raise HashingPoolSaturated()
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            incr_counter(self.stats_namespace, 'timed_out')
+            logger.warning(f'Password hashing job waited more than {self.timeout}s, shedding request')
+            raise HashingPoolSaturated()
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self):
+        """Return job counters and this process's number of queued or running jobs."""
+        return {**read_counters(self.stats_namespace, self.stat_names), 'in_flight': self._in_flight}
+
+    def reset_stats(self):
+        reset_counters(self.stats_namespace, self.stat_names)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Outside the lock: finishing jobs release their slot through it
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool()
+
+
+def _verify(raw_password, encoded):
+    is_correct, must_update = verify_password(raw_password, encoded)
+    upgraded = make_password(raw_password) if is_correct and must_update else None
+    return is_correct, upgraded
+
+
+def hash_password(raw_password):
+    """make_password() on the hashing pool."""
+    if raw_password is None:
+        # Unusable password, no hashing involved
+        return make_password(None)
+    return hashing_pool.run(make_password, raw_password)
+
+
+def check_user_password(user, raw_password):
+    """
+    Verify a user's password on the hashing pool.
+
+    When the stored hash uses an outdated hasher or work factor, the
+    replacement hash is computed in the same pool job and saved here, so a
+    successful login transparently upgrades it.
+    """
+    is_correct, upgraded = hashing_pool.run(_verify, raw_password, user.password)
+    if upgraded is not None:
+        user.password = upgraded
+        # Hash upgrades are not password changes
+        user._password = None
+        user.save(update_fields=['password'])
+        logger.info(f'Upgraded password hash for user: {user.pk}')
+    return is_correct
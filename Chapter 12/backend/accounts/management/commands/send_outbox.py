@@ -0,0 +1,54 @@
+"""
+Background sender for the email outbox (accounts/outbox.py).
+
+Sends every due OutboxEmail in batches over one reused EMAIL_BACKEND
+connection. Run it once from cron, or as a long-lived worker with --loop.
+
+Usage:
+    python manage.py send_outbox
+    python manage.py send_outbox --loop --interval 2
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails claimed per batch (default: OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new emails instead of exiting'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds between polls with --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            report = send_pending(batch_size=options['batch_size'])
+            if any(report.values()) or not options['loop']:
+                elapsed = time.monotonic() - start
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {report['sent']}, skipped {report['skipped']}, "
+                    f"failed {report['failed']} emails in {elapsed:.2f}s"
+                ))
+            if not options['loop']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
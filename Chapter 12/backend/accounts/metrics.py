@@ -0,0 +1,35 @@
+"""
+Cross-process counters for the accounts API.
+
+Counters live in the shared cache, so every worker adds to the same totals
+and AuthStatsView reports numbers for the whole deployment rather than the
+process that happened to serve the request. Keys never expire;
+`reset_counters()` clears them.
+"""
+from django.core.cache import cache
+
+
+def counter_key(namespace, name):
+    return f'accounts:metrics:{namespace}:{name}'
+
+
+def incr_counter(namespace, name):
+    """Atomically increment a counter, creating it if it does not exist."""
+    key = counter_key(namespace, name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, None):
+            return 1
+        return cache.incr(key)
+
+
+def read_counters(namespace, names):
+    """Return {name: value} for the given counters in one get_many."""
+    keys = {name: counter_key(namespace, name) for name in names}
+    values = cache.get_many(list(keys.values()))
+    return {name: values.get(key, 0) for name, key in keys.items()}
+
+
+def reset_counters(namespace, names):
+    cache.delete_many([counter_key(namespace, name) for name in names])
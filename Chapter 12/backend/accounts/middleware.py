@@ -1,23 +1,127 @@
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.db import close_old_connections
-from urllib.parse import parse_qs
-from asgiref.sync import sync_to_async
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ais_revoked
+from .principals import UserPrincipal
+
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of access token -> (UserPrincipal, validated token).
+
+    Entries expire at the token's `exp` claim, capped by
+    WS_AUTH_CACHE_TTL seconds so role or status changes are picked up
+    within that window. WS_AUTH_CACHE_SIZE bounds memory per process.
+    Revocations take effect at once: callers check every token against
+    the revocation list and `discard_user()` the user's entries.
+
+    The cache is only touched from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_size=None, max_ttl=None):
+        self._max_size = max_size
+        self._max_ttl = max_ttl
+        self._entries = OrderedDict()
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, 'WS_AUTH_CACHE_SIZE', 10000)
+
+    @property
+    def max_ttl(self):
+        if self._max_ttl is not None:
+            return self._max_ttl
+        return getattr(settings, 'WS_AUTH_CACHE_TTL', 300)
+
+    def get_entry(self, token):
+        """Return (principal, validated_token) for a cached token, or None."""
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        principal, validated_token, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return principal, validated_token
+
+    def get(self, token):
+        entry = self.get_entry(token)
+        return entry[0] if entry is not None else None
 
+    def set(self, token, principal, exp, validated_token=None):
+        expires_at = min(exp, time.time() + self.max_ttl)
+        self._entries[token] = (principal, validated_token, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
 
-@sync_to_async
-def get_user_from_token(raw_token: str):
+    def discard_user(self, user_id):
+        """Drop every cached token of a user."""
+        stale = [token for token, (principal, _, _) in self._entries.items() if principal.id == user_id]
+        for token in stale:
+            del self._entries[token]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache()
+
+
+@database_sync_to_async
+def load_principal(jwt_auth, validated_token):
+    return UserPrincipal.from_user(jwt_auth.get_user(validated_token))
+
+
+async def get_user_from_token(raw_token: str):
+    """
+    Resolve an access token to a UserPrincipal.
+
+    Cached tokens resolve with a single revocation lookup in the shared
+    cache and no database query. On a miss the signature and claims are
+    checked inline (HMAC verification is cheap and needs no thread), and
+    only the user lookup is sent to the database thread pool.
+
+    Raises AuthenticationFailed for revoked tokens, after dropping the
+    user's cached principals.
+    """
     jwt_auth = JWTAuthentication()
-    validated_token = jwt_auth.get_validated_token(raw_token)
-    return jwt_auth.get_user(validated_token)
+    entry = principal_cache.get_entry(raw_token)
+    if entry is not None:
+        principal, validated_token = entry
+    else:
+        principal = None
+        validated_token = jwt_auth.get_validated_token(raw_token)
+
+    if await ais_revoked(validated_token):
+        user_id = jwt_auth.user_model._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        principal_cache.discard_user(user_id)
+        raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+    if principal is None:
+        principal = await load_principal(jwt_auth, validated_token)
+        principal_cache.set(raw_token, principal, validated_token['exp'], validated_token)
+    return principal
 
 
 class TokenAuthMiddleware(BaseMiddleware):
     async def __call__(self, scope, receive, send):
-        close_old_connections()
-
         query_params = parse_qs(scope.get("query_string", b"").decode("utf-8"))
         token_list = query_params.get("token", [])
         token = token_list[0] if token_list else None
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .hashing import check_user_password, hash_password
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -62,6 +65,14 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
+    def set_password(self, raw_password):
+        # Hashing runs on the bounded pool, see accounts/hashing.py
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        return check_user_password(self, raw_password)
+
     @property
     def is_student(self):
         return self.role == self.Role.STUDENT
@@ -82,4 +93,38 @@ class Profile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.user.email}'s profile"
\ No newline at end of file
+        return f"{self.user.email}'s profile"
+
+class OutboxEmail(models.Model):
+    """
+    Email waiting to be sent by the outbox sender (accounts/outbox.py).
+
+    Requests only insert a row; rendering and SMTP happen in the
+    send_outbox command.
+    """
+    class Kind(models.TextChoices):
+        PASSWORD_RESET = 'password_reset', _('Password reset')
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENT = 'sent', _('Sent')
+        SKIPPED = 'skipped', _('Skipped')
+        FAILED = 'failed', _('Failed')
+
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    recipient = models.EmailField()
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.recipient} ({self.status})"
@@ -0,0 +1,162 @@
+"""
+Email outbox.
+
+Views never talk to SMTP. They insert an OutboxEmail row with `enqueue()`
+and return, so an SMTP stall cannot block a worker and the response does
+not depend on what the email will contain. For password resets the row
+holds only the submitted address; whether an account exists is decided by
+the sender, which silently skips unknown addresses.
+
+`send_pending()` (run by the send_outbox command) claims due rows in
+batches, renders them and sends the whole batch over one reused
+connection of the configured EMAIL_BACKEND. A failed message is retried
+with exponential backoff (OUTBOX_RETRY_DELAY doubling up to
+OUTBOX_MAX_RETRY_DELAY) and marked failed after OUTBOX_MAX_ATTEMPTS.
+
+Claiming moves `next_attempt_at` past OUTBOX_CLAIM_TIMEOUT, so rows of a
+sender that died mid-batch become due again, and several senders can run
+side by side.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import OutboxEmail
+
+logger = logging.getLogger('auth')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(kind, recipient, **context):
+    """Queue an email for the sender. One INSERT, no rendering or I/O."""
+    return OutboxEmail.objects.create(kind=kind, recipient=recipient, context=context)
+
+
+def render_password_reset(outbox_email):
+    user = get_user_model().objects.filter(email=outbox_email.recipient).first()
+    if user is None or not user.is_active:
+        return None
+
+    # The token is made at send time, so it is always fresh and bound to
+    # the password hash at that moment
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    reset_link = f"{outbox_email.context['base_url']}/reset-password/{uid}/{token}"
+
+    body = render_to_string('accounts/password_reset_email.html', {
+        'user': user,
+        'reset_link': reset_link,
+    })
+    return EmailMessage(
+        'Password Reset Request',
+        body,
+        settings.EMAIL_HOST_USER,
+        [user.email],
+    )
+
+
+RENDERERS = {
+    OutboxEmail.Kind.PASSWORD_RESET: render_password_reset,
+}
+
+
+def retry_delay(attempts):
+    delay = _setting('OUTBOX_RETRY_DELAY', 30) * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, _setting('OUTBOX_MAX_RETRY_DELAY', 3600)))
+
+
+def claim_batch(batch_size):
+    """Claim up to batch_size due rows and count the attempt on each."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            claimed_until = now + timedelta(seconds=_setting('OUTBOX_CLAIM_TIMEOUT', 300))
+            for outbox_email in batch:
+                outbox_email.attempts += 1
+                outbox_email.next_attempt_at = claimed_until
+            OutboxEmail.objects.bulk_update(batch, ['attempts', 'next_attempt_at'])
+    return batch
+
+
+def _failed(outbox_email, error):
+    outbox_email.last_error = str(error)[:1000]
+    if outbox_email.attempts >= _setting('OUTBOX_MAX_ATTEMPTS', 5):
+        outbox_email.status = OutboxEmail.Status.FAILED
+        logger.error(f'Giving up on outbox email {outbox_email.pk} after {outbox_email.attempts} attempts: {error}')
+    else:
+        outbox_email.next_attempt_at = timezone.now() + retry_delay(outbox_email.attempts)
+        logger.warning(f'Outbox email {outbox_email.pk} failed, retrying at {outbox_email.next_attempt_at}: {error}')
+
+
+def send_batch(batch, connection):
+    """Render and send a claimed batch over an open connection."""
+    report = {'sent': 0, 'skipped': 0, 'failed': 0}
+    for outbox_email in batch:
+        try:
+            message = RENDERERS[outbox_email.kind](outbox_email)
+            if message is None:
+                outbox_email.status = OutboxEmail.Status.SKIPPED
+                report['skipped'] += 1
+                continue
+            message.connection = connection
+            connection.send_messages([message])
+        except Exception as e:
+            _failed(outbox_email, e)
+            report['failed'] += 1
+        else:
+            outbox_email.status = OutboxEmail.Status.SENT
+            outbox_email.sent_at = timezone.now()
+            report['sent'] += 1
+
+    OutboxEmail.objects.bulk_update(
+        batch, ['status', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return report
+
+
+def send_pending(batch_size=None, connection=None):
+    """
+    Send every due outbox email.
+
+    Returns a report dict with sent, skipped and failed counts.
+    """
+    batch_size = batch_size or _setting('OUTBOX_BATCH_SIZE', 100)
+    report = {'sent': 0, 'skipped': 0, 'failed': 0}
+
+    batch = claim_batch(batch_size)
+    if not batch:
+        return report
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        with connection:
+            while batch:
+                for key, value in send_batch(batch, connection).items():
+                    report[key] += value
+                batch = claim_batch(batch_size)
+    except Exception as e:
+        # Opening the connection failed: schedule the claimed batch for retry
+        logger.error(f'Outbox connection error: {e}')
+        unsent = [outbox_email for outbox_email in batch if outbox_email.status == OutboxEmail.Status.PENDING]
+        for outbox_email in unsent:
+            _failed(outbox_email, e)
+        OutboxEmail.objects.bulk_update(unsent, ['status', 'next_attempt_at', 'last_error'])
+        report['failed'] += len(unsent)
+    return report
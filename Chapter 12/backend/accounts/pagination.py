@@ -1,6 +1,19 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the user table.
+
+    Pages are `WHERE id > <cursor> ORDER BY id LIMIT n` range scans on the
+    primary key, so page 50,000 costs the same as page 1 and no COUNT(*)
+    runs. Works with values() querysets as well as model instances.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
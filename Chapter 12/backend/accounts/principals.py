@@ -0,0 +1,68 @@
+"""
+Lightweight authenticated user for websocket scopes and DRF requests.
+
+Consumers only read identity and role flags from `scope["user"]`, so the
+websocket middleware caches this small, immutable-by-convention snapshot
+of the user row instead of a model instance. StatelessJWTAuthentication
+builds the same object from token claims for `request.user`. Use `user_id=principal.id`
+in ORM filters, or `get_user()` when the full model is really needed.
+"""
+from django.contrib.auth import get_user_model
+
+
+class UserPrincipal:
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, email, name='', role='', username=None,
+                 is_staff=False, is_superuser=False, is_active=True):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.role = role
+        self.username = username
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+        self.is_active = is_active
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.pk,
+            email=user.email,
+            name=getattr(user, 'name', ''),
+            role=getattr(user, 'role', ''),
+            username=getattr(user, 'username', None),
+            is_staff=user.is_staff,
+            is_superuser=user.is_superuser,
+            is_active=user.is_active,
+        )
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_student(self):
+        return self.role == get_user_model().Role.STUDENT
+
+    @property
+    def is_instructor(self):
+        return self.role == get_user_model().Role.INSTRUCTOR
+
+    @property
+    def is_administrator(self):
+        return self.role == get_user_model().Role.ADMINISTRATOR
+
+    def get_user(self):
+        """Load the full user model (runs a query; call from sync code)."""
+        return get_user_model().objects.get(pk=self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, UserPrincipal) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.email
@@ -68,11 +68,59 @@ class TestAuthentication:
 @pytest.mark.django_db
 class TestPasswordReset:
     def test_password_reset_request(self, api_client, created_user):
+        from accounts.outbox import send_pending
+
         response = api_client.post(reverse('password_reset'), {
             'email': created_user.email
         })
         assert response.status_code == status.HTTP_200_OK
+        assert len(mail.outbox) == 0
+
+        assert send_pending() == {'sent': 1, 'skipped': 0, 'failed': 0}
         assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [created_user.email]
+
+    def test_password_reset_unknown_email(self, api_client, created_user):
+        from accounts.outbox import send_pending
+
+        known = api_client.post(reverse('password_reset'), {'email': created_user.email})
+        unknown = api_client.post(reverse('password_reset'), {'email': 'nobody@example.com'})
+        assert unknown.status_code == known.status_code
+        assert unknown.data == known.data
+
+        assert send_pending() == {'sent': 1, 'skipped': 1, 'failed': 0}
+        assert len(mail.outbox) == 1
+
+    def test_outbox_retries_with_backoff(self, created_user, settings):
+        from django.utils import timezone
+        from accounts.models import OutboxEmail
+        from accounts.outbox import enqueue, send_pending
+
+        class FailingConnection:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                pass
+
+            def send_messages(self, messages):
+                raise OSError('SMTP unavailable')
+
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        outbox_email = enqueue(OutboxEmail.Kind.PASSWORD_RESET, created_user.email, base_url='http://testserver')
+
+        assert send_pending(connection=FailingConnection())['failed'] == 1
+        outbox_email.refresh_from_db()
+        assert outbox_email.status == OutboxEmail.Status.PENDING
+        assert outbox_email.attempts == 1
+        assert outbox_email.next_attempt_at > timezone.now()
+        assert send_pending(connection=FailingConnection())['failed'] == 0
+
+        OutboxEmail.objects.filter(pk=outbox_email.pk).update(next_attempt_at=timezone.now())
+        send_pending(connection=FailingConnection())
+        outbox_email.refresh_from_db()
+        assert outbox_email.status == OutboxEmail.Status.FAILED
+        assert 'SMTP unavailable' in outbox_email.last_error
 
     def test_password_reset_confirm(self, api_client, created_user):
        
@@ -122,3 +170,345 @@ class TestAuthenticationIntegration:
     def test_protected_endpoint_access(self, authenticated_client):
         response = authenticated_client.get(reverse('protected-endpoint'))
         assert response.status_code == status.HTTP_200_OK
+
+@pytest.mark.django_db
+class TestTokenAuthMiddleware:
+    @pytest.fixture(autouse=True)
+    def empty_principal_cache(self):
+        from accounts.middleware import principal_cache
+        principal_cache.clear()
+        yield
+        principal_cache.clear()
+
+    def test_token_resolves_to_principal(self, created_user):
+        from asgiref.sync import async_to_sync
+        from rest_framework_simplejwt.tokens import AccessToken
+        from accounts.middleware import get_user_from_token
+
+        principal = async_to_sync(get_user_from_token)(str(AccessToken.for_user(created_user)))
+        assert principal.is_authenticated
+        assert principal.id == created_user.id
+        assert principal.email == created_user.email
+
+    def test_cached_token_skips_database(self, created_user, django_assert_num_queries):
+        from asgiref.sync import async_to_sync
+        from rest_framework_simplejwt.tokens import AccessToken
+        from accounts.middleware import get_user_from_token
+
+        token = str(AccessToken.for_user(created_user))
+        async_to_sync(get_user_from_token)(token)
+        with django_assert_num_queries(0):
+            principal = async_to_sync(get_user_from_token)(token)
+        assert principal.id == created_user.id
+
+    def test_revoked_token_is_rejected_and_evicted(self, created_user):
+        from asgiref.sync import async_to_sync
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+        from accounts.authentication import issue_tokens, revoke_user
+        from accounts.middleware import get_user_from_token, principal_cache
+
+        cache.clear()
+        first, second = (str(issue_tokens(created_user).access_token) for _ in range(2))
+        async_to_sync(get_user_from_token)(first)
+        async_to_sync(get_user_from_token)(second)
+        assert len(principal_cache) == 2
+
+        revoke_user(created_user.id)
+        with pytest.raises(AuthenticationFailed):
+            async_to_sync(get_user_from_token)(first)
+        assert len(principal_cache) == 0
+        with pytest.raises(AuthenticationFailed):
+            async_to_sync(get_user_from_token)(second)
+
+    def test_invalid_token_is_anonymous(self):
+        from asgiref.sync import async_to_sync
+        from accounts.middleware import TokenAuthMiddleware
+
+        scopes = []
+
+        async def inner(scope, receive, send):
+            scopes.append(scope)
+
+        middleware = TokenAuthMiddleware(inner)
+        async_to_sync(middleware)(
+            {'type': 'websocket', 'query_string': b'token=not-a-jwt'}, None, None
+        )
+        assert not scopes[0]['user'].is_authenticated
+
+    def test_cache_expiry_and_eviction(self):
+        import time
+        from accounts.middleware import PrincipalCache
+        from accounts.principals import UserPrincipal
+
+        cache_ = PrincipalCache(max_size=2, max_ttl=60)
+        now = time.time()
+        cache_.set('expired', UserPrincipal(1, 'a@example.com'), now - 1)
+        assert cache_.get('expired') is None
+
+        cache_.set('a', UserPrincipal(1, 'a@example.com'), now + 3600)
+        cache_.set('b', UserPrincipal(2, 'b@example.com'), now + 3600)
+        cache_.get('a')
+        cache_.set('c', UserPrincipal(3, 'c@example.com'), now + 3600)
+        assert cache_.get('b') is None
+        assert cache_.get('a').id == 1
+        assert len(cache_) == 2
+
+@pytest.mark.django_db
+class TestLoginRateLimiter:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_locked_out_email_skips_database(self, created_user, user_data, django_assert_num_queries):
+        from django.contrib.auth import authenticate
+
+        for _ in range(5):
+            assert authenticate(None, username=user_data['email'], password='wrongpassword') is None
+        with django_assert_num_queries(0):
+            assert authenticate(None, username=user_data['email'], password=user_data['password']) is None
+
+    def test_success_resets_email_counter(self, created_user, user_data):
+        from django.contrib.auth import authenticate
+
+        for _ in range(4):
+            authenticate(None, username=user_data['email'], password='wrongpassword')
+        assert authenticate(None, username=user_data['email'], password=user_data['password']) is not None
+        assert authenticate(None, username=user_data['email'], password='wrongpassword') is None
+        assert authenticate(None, username=user_data['email'], password=user_data['password']) is not None
+
+    def test_per_ip_limit(self):
+        from accounts.throttling import LoginRateLimiter
+
+        limiter = LoginRateLimiter(max_attempts=5, max_attempts_per_ip=3, window=300)
+        results = [limiter.acquire(f'user{i}@example.com', '10.0.0.1') for i in range(4)]
+        assert results == [True, True, True, False]
+        assert limiter.acquire('user9@example.com', '10.0.0.2')
+        assert limiter.stats() == {'evaluated': 4, 'blocked': 1}
+
+    def test_stats_view_is_admin_only(self, api_client, created_user, user_model):
+        from accounts.throttling import login_limiter
+
+        login_limiter.acquire('user@example.com', '10.0.0.1')
+        api_client.force_authenticate(created_user)
+        assert api_client.get(reverse('auth-stats')).status_code == status.HTTP_403_FORBIDDEN
+
+        admin = user_model.objects.create_superuser(email='root@example.com', password='TestPass123!', name='Root')
+        api_client.force_authenticate(admin)
+        response = api_client.get(reverse('auth-stats'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['login'] == {'evaluated': 1, 'blocked': 0}
+
+    def test_client_ip_from_trusted_proxy_hop(self, settings):
+        from django.test import RequestFactory
+        from accounts.throttling import get_client_ip
+
+        request = RequestFactory().post(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7'
+        )
+        assert get_client_ip(request) == '10.0.0.1'
+        settings.LOGIN_TRUSTED_PROXIES = 1
+        # The spoofable first entry is ignored
+        assert get_client_ip(request) == '203.0.113.7'
+
+@pytest.mark.django_db
+class TestPasswordHashingPool:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_saturated_pool_sheds(self):
+        import threading
+        from accounts.hashing import HashingPool, HashingPoolSaturated
+
+        pool = HashingPool(max_workers=1, max_queue=0, timeout=5)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return 'done'
+
+        blocker = threading.Thread(target=pool.run, args=(block,))
+        blocker.start()
+        started.wait(5)
+        with pytest.raises(HashingPoolSaturated):
+            pool.run(lambda: None)
+        release.set()
+        blocker.join()
+
+        assert pool.run(lambda: 'ok') == 'ok'
+        assert pool.stats() == {'submitted': 2, 'shed': 1, 'timed_out': 0, 'in_flight': 0}
+        pool.shutdown()
+
+    def test_login_upgrades_outdated_hash(self, created_user, user_data):
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+        legacy = type('LegacyPBKDF2', (PBKDF2PasswordHasher,), {'iterations': 1000})()
+        created_user.password = legacy.encode(user_data['password'], legacy.salt())
+        created_user.save(update_fields=['password'])
+
+        assert created_user.check_password(user_data['password'])
+        created_user.refresh_from_db()
+        assert created_user.password.split('$')[1] == str(PBKDF2PasswordHasher.iterations)
+
+    def test_login_returns_503_when_saturated(self, api_client, created_user, user_data, monkeypatch):
+        from accounts.hashing import HashingPoolSaturated, hashing_pool
+
+        def saturated(*args):
+            raise HashingPoolSaturated()
+
+        monkeypatch.setattr(hashing_pool, 'run', saturated)
+        response = api_client.post(reverse('login'), {
+            'email': user_data['email'],
+            'password': user_data['password']
+        })
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+
+    def test_django_views_return_503_when_saturated(self):
+        from django.test import RequestFactory
+        from accounts.exceptions import HashingPoolSaturatedMiddleware
+        from accounts.hashing import HashingPoolSaturated
+
+        def admin_login(request):
+            raise HashingPoolSaturated()
+
+        middleware = HashingPoolSaturatedMiddleware(admin_login)
+        request = RequestFactory().post('/admin/login/')
+        response = middleware.process_exception(request, HashingPoolSaturated())
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+        assert middleware.process_exception(request, ValueError()) is None
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def authenticate(self, token):
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.request import Request
+        from accounts.authentication import StatelessJWTAuthentication
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return StatelessJWTAuthentication().authenticate(Request(request))
+
+    def test_claims_resolve_without_query(self, created_user, django_assert_num_queries):
+        from accounts.authentication import issue_tokens
+        from accounts.principals import UserPrincipal
+
+        token = issue_tokens(created_user).access_token
+        with django_assert_num_queries(0):
+            user, _ = self.authenticate(token)
+        assert isinstance(user, UserPrincipal)
+        assert user.id == created_user.id
+        assert user.role == created_user.role
+        assert (user.is_staff, user.is_superuser) == (False, False)
+
+    def test_staff_flags_come_from_claims(self, user_model, django_assert_num_queries):
+        from accounts.authentication import issue_tokens
+
+        admin = user_model.objects.create_superuser(email='root@example.com', password='TestPass123!', name='Root')
+        token = issue_tokens(admin).access_token
+        with django_assert_num_queries(0):
+            user, _ = self.authenticate(token)
+        assert user.is_staff and user.is_superuser
+
+    def test_token_without_claims_falls_back_to_database(self, created_user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user, _ = self.authenticate(AccessToken.for_user(created_user))
+        assert user == created_user
+
+    def test_revoked_session_and_user(self, created_user):
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+        from accounts.authentication import issue_tokens, revoke_session, revoke_user
+
+        first, second = issue_tokens(created_user), issue_tokens(created_user)
+        revoke_session(first['sid'])
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(first.access_token)
+        assert self.authenticate(second.access_token)[0].id == created_user.id
+
+        revoke_user(created_user.id)
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(second.access_token)
+
+    def test_logout_revokes_token(self, api_client, created_user, user_data):
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+        response = api_client.post(reverse('login'), {
+            'email': user_data['email'],
+            'password': user_data['password']
+        })
+        access = response.data['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        assert api_client.post(reverse('logout')).status_code == status.HTTP_200_OK
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_change_own_password_with_login_token(self, api_client, created_user, user_data):
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+        response = api_client.post(reverse('login'), {
+            'email': user_data['email'],
+            'password': user_data['password']
+        })
+        access = response.data['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = api_client.post(reverse('change-password', kwargs={'pk': 'me'}), {
+            'old_password': user_data['password'],
+            'new_password': 'NewPass456!',
+        })
+        assert response.status_code == status.HTTP_200_OK
+        created_user.refresh_from_db()
+        assert created_user.check_password('NewPass456!')
+
+        # Earlier tokens are revoked, the returned pair keeps working
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(access)
+        assert self.authenticate(response.data['access'])[0].id == created_user.id
+
+    def login(self, api_client, email, password):
+        response = api_client.post(reverse('login'), {'email': email, 'password': password})
+        return response.data['access']
+
+    def test_profile_edit_reissues_tokens_without_revoking(self, api_client, created_user, user_data):
+        access = self.login(api_client, user_data['email'], user_data['password'])
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = api_client.patch(reverse('user-detail', kwargs={'pk': 'me'}), {'name': 'Renamed'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['name'] == 'Renamed'
+
+        # Other sessions keep working; the returned pair carries the new name
+        assert self.authenticate(access)[0].name == created_user.name
+        user, token = self.authenticate(response.data['tokens']['access'])
+        assert user.name == 'Renamed'
+        assert token['sid'] == self.authenticate(access)[1]['sid']
+
+    def test_role_change_revokes_tokens(self, api_client, user_model, created_user, user_data):
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+        user_access = self.login(api_client, user_data['email'], user_data['password'])
+        user_model.objects.create_user(
+            email='admin@example.com', password='TestPass123!', name='Admin', role='administrator'
+        )
+        admin_access = self.login(api_client, 'admin@example.com', 'TestPass123!')
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {admin_access}')
+
+        response = api_client.patch(
+            reverse('user-detail', kwargs={'pk': created_user.pk}), {'role': 'instructor'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert 'tokens' not in response.data
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(user_access)
@@ -0,0 +1,153 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import incr_counter, read_counters, reset_counters
+
+
+class LoginRateLimiter:
+    """
+    Sliding-window login attempt limiter, keyed per email and per client IP.
+
+    Each window of LOCKOUT_TIME seconds has its own counter per key:
+
+        login:attempts:<email|ip>:<digest>:<window number>
+
+    The attempt count is the current window's counter plus the previous
+    window's counter weighted by how much of it still overlaps the sliding
+    window, so a lockout decays smoothly instead of resetting at a boundary.
+
+    Counters only move through cache.incr, so parallel attempts each see a
+    distinct count and at most MAX_LOGIN_ATTEMPTS (per email) or
+    MAX_LOGIN_ATTEMPTS_PER_IP (per IP) of them are evaluated per window.
+    An address that is already over its limit is rejected after a single
+    get_many, before any database query or password hash.
+
+    Client IPs come from `get_client_ip()`; behind a reverse proxy set
+    LOGIN_TRUSTED_PROXIES, or every client shares the proxy's limit. Set
+    MAX_LOGIN_ATTEMPTS_PER_IP to None to disable the per-IP limit.
+
+    Evaluated and blocked attempts are counted in shared cache counters
+    across all workers, see `stats()`.
+    """
+
+    stats_namespace = 'login'
+    stat_names = ('evaluated', 'blocked')
+
+    def __init__(self, max_attempts=None, max_attempts_per_ip=None, window=None):
+        self._max_attempts = max_attempts
+        self._max_attempts_per_ip = max_attempts_per_ip
+        self._window = window
+
+    @property
+    def max_attempts(self):
+        if self._max_attempts is not None:
+            return self._max_attempts
+        return settings.MAX_LOGIN_ATTEMPTS
+
+    @property
+    def max_attempts_per_ip(self):
+        if self._max_attempts_per_ip is not None:
+            return self._max_attempts_per_ip
+        return getattr(settings, 'MAX_LOGIN_ATTEMPTS_PER_IP', 50)
+
+    @property
+    def window(self):
+        if self._window is not None:
+            return self._window
+        return settings.LOCKOUT_TIME
+
+    def _scopes(self, email, ip):
+        # Hashed so arbitrary user input always makes a valid cache key
+        scopes = [('email', email.strip().lower(), self.max_attempts)]
+        if ip and self.max_attempts_per_ip:
+            scopes.append(('ip', ip, self.max_attempts_per_ip))
+        return [
+            (f"login:attempts:{name}:{hashlib.sha256(value.encode()).hexdigest()[:32]}", limit)
+            for name, value, limit in scopes
+        ]
+
+    def _window_keys(self, prefix, now):
+        current = int(now // self.window)
+        return f'{prefix}:{current}', f'{prefix}:{current - 1}'
+
+    def _weight(self, now):
+        """Share of the previous window still inside the sliding window."""
+        return 1 - (now % self.window) / self.window
+
+    def acquire(self, email, ip=None):
+        """
+        Count a login attempt and return whether it may be evaluated.
+
+        Returns False, without writing anything, when the email or IP is
+        already over its limit.
+        """
+        now = time.time()
+        weight = self._weight(now)
+        scopes = [(self._window_keys(prefix, now), limit) for prefix, limit in self._scopes(email, ip)]
+        counts = cache.get_many([key for keys, _ in scopes for key in keys])
+
+        for (current_key, previous_key), limit in scopes:
+            attempts = counts.get(current_key, 0) + counts.get(previous_key, 0) * weight
+            if attempts >= limit:
+                incr_counter(self.stats_namespace, 'blocked')
+                return False
+
+        allowed = True
+        for (current_key, previous_key), limit in scopes:
+            # incr needs an existing key; add is a no-op when it already exists
+            cache.add(current_key, 0, self.window * 2)
+            try:
+                current = cache.incr(current_key)
+            except ValueError:
+                current = 1
+            if current + counts.get(previous_key, 0) * weight > limit:
+                allowed = False
+
+        incr_counter(self.stats_namespace, 'evaluated' if allowed else 'blocked')
+        return allowed
+
+    def succeeded(self, email, ip=None):
+        """
+        Reset the email's counters and give the attempt back to the IP, so
+        successful logins from a shared address never lock it out.
+        """
+        now = time.time()
+        (email_prefix, _), *ip_scope = self._scopes(email, ip)
+        cache.delete_many(list(self._window_keys(email_prefix, now)))
+        for prefix, _ in ip_scope:
+            try:
+                cache.decr(self._window_keys(prefix, now)[0])
+            except ValueError:
+                pass
+
+    def stats(self):
+        """Attempts evaluated and blocked since the last `reset_stats()`."""
+        return read_counters(self.stats_namespace, self.stat_names)
+
+    def reset_stats(self):
+        reset_counters(self.stats_namespace, self.stat_names)
+
+
+login_limiter = LoginRateLimiter()
+
+
+def get_client_ip(request):
+    """
+    Return the client address of a request.
+
+    With LOGIN_TRUSTED_PROXIES = n reverse proxies in front of the app,
+    the client is the address the outermost proxy appended to
+    X-Forwarded-For, n hops from the end; entries before it are set by the
+    client and cannot be trusted. With 0 (the default) REMOTE_ADDR is used.
+    """
+    if request is None:
+        return None
+    trusted_proxies = getattr(settings, 'LOGIN_TRUSTED_PROXIES', 0)
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if trusted_proxies and forwarded_for:
+        addresses = [address.strip() for address in forwarded_for.split(',')]
+        return addresses[-min(trusted_proxies, len(addresses))] or None
+    return request.META.get('REMOTE_ADDR')
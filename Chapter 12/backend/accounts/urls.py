@@ -9,6 +9,7 @@ urlpatterns = [
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('stats/', views.AuthStatsView.as_view(), name='auth-stats'),
     
     # User management endpoints
     path('users/', views.UserListView.as_view(), name='user-list'),
@@ -1,28 +1,38 @@
 import logging
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import urlsafe_base64_decode
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer, ChangePasswordSerializer
-from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import update_session_auth_hash
-from .models import CustomUser
+from .models import CustomUser, OutboxEmail
+from .outbox import enqueue
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
 from rest_framework.generics import ListAPIView
-from .pagination import CustomPageNumberPagination
+from .authentication import (
+    FullUserMixin, get_full_user, issue_tokens, revoke_session, revoke_user, token_claims,
+    update_token_claims
+)
+from .hashing import HashingPoolSaturated, hashing_pool
+from .pagination import CustomPageNumberPagination, UserCursorPagination
+from .throttling import login_limiter
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
 from django.db.models import Count, Avg, Sum
 
 logger = logging.getLogger('auth')
 
+USER_LIST_FIELDS = ('id', 'email', 'name', 'role', 'avatar', 'bio', 'date_joined')
+
 class RegisterView(APIView):
     permission_classes = (permissions.AllowAny,)
 
@@ -54,7 +64,7 @@ class LoginView(APIView):
             user = authenticate(request, username=email, password=password)
             
             if user is not None:
-                refresh = RefreshToken.for_user(user)
+                refresh = issue_tokens(user)
                 return Response({
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -69,7 +79,10 @@ class LoginView(APIView):
                 return Response({
                     'error': 'Invalid credentials'
                 }, status=status.HTTP_401_UNAUTHORIZED)
-                
+
+        except HashingPoolSaturated:
+            # Shed with 503 by accounts.exceptions.exception_handler
+            raise
         except Exception as e:
             logger.error(f"Login error: {str(e)}")
             return Response({
@@ -78,57 +91,49 @@ class LoginView(APIView):
 
 class LogoutView(APIView):
     def post(self, request):
+        if request.auth is not None and 'sid' in request.auth:
+            revoke_session(request.auth['sid'])
         logout(request)
         return Response({
             'message': 'Logout Successful'
         })
 
-class UserView(APIView):
+class UserView(FullUserMixin, APIView):
     def get(self, request):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
     def patch(self, request):
+        claims = token_claims(request.user)
         serializer = UserSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            data = dict(serializer.data)
+            tokens = update_token_claims(request, request.user, claims)
+            if tokens:
+                data['tokens'] = tokens
+            return Response(data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class PasswordResetRequestView(APIView):
-   
-    
+
     def post(self, request):
         email = request.data.get('email')
-        user = get_user_model().objects.filter(email=email).first()
-        
-        if user:
-            # Generate password reset token
-            token = default_token_generator.make_token(user)
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            
-            # Create reset link
-            reset_link = f"{request.scheme}://{request.get_host()}/reset-password/{uid}/{token}"
-            
-            # Send email
-            context = {
-                'user': user,
-                'reset_link': reset_link,
-            }
-            
-            email_body = render_to_string('accounts/password_reset_email.html', context)
-            
-            send_mail(
-                'Password Reset Request',
-                email_body,
-                settings.EMAIL_HOST_USER,
-                [user.email],
-                fail_silently=False,
+
+        # Same work and response whether or not the account exists: the
+        # outbox sender looks the user up and skips unknown addresses
+        try:
+            validate_email(email)
+        except DjangoValidationError:
+            email = None
+        if email:
+            enqueue(
+                OutboxEmail.Kind.PASSWORD_RESET,
+                email,
+                base_url=f"{request.scheme}://{request.get_host()}"
             )
-            
-            logger.info(f'Password reset requested for user: {user.email}')
-            return Response({'message': 'Password reset email sent'})
-        
+            logger.info(f'Password reset queued for: {email}')
+
         return Response({'message': 'If an account exists with this email, a password reset link will be sent'})
 
 class PasswordResetConfirmView(APIView):
@@ -142,6 +147,7 @@ class PasswordResetConfirmView(APIView):
                 new_password = request.data.get('new_password')
                 user.set_password(new_password)
                 user.save()
+                revoke_user(user.id)
                 
                 logger.info(f'Password reset successful for user: {user.email}')
                 return Response({'message': 'Password reset successful'})
@@ -159,7 +165,69 @@ class PasswordResetConfirmView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class UserListView(APIView):
+class ProjectedUserListMixin:
+    """
+    Paginated, field-projected user listing.
+
+    Rows are read with values() for just the requested columns, so large
+    fields such as `bio` are only loaded when asked for and no model
+    instances are built.
+
+    Query parameters:
+    - fields: Comma separated subset of USER_LIST_FIELDS (default: all);
+      `id` is always included because it is the pagination key
+    - cursor / page_size: Keyset pagination (see UserCursorPagination)
+    - stream=true: Stream every matching row as one JSON array instead of
+      a page, reading the table in chunks
+    """
+    pagination_class = UserCursorPagination
+    stream_chunk_size = 2000
+
+    def get_list_fields(self, request):
+        requested = request.query_params.get('fields')
+        if not requested:
+            return list(USER_LIST_FIELDS)
+
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = sorted(set(fields) - set(USER_LIST_FIELDS))
+        if unknown:
+            raise ValidationError({
+                'fields': f"Unknown fields: {', '.join(unknown)}. "
+                          f"Allowed: {', '.join(USER_LIST_FIELDS)}"
+            })
+        return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+
+    def to_representation(self, row):
+        # Same as UserSerializer without a request in its context, as the
+        # list views used before: the storage URL, not an absolute one
+        if row.get('avatar'):
+            row['avatar'] = default_storage.url(row['avatar'])
+        elif 'avatar' in row:
+            row['avatar'] = None
+        return row
+
+    def list_users(self, request, queryset):
+        rows = queryset.values(*self.get_list_fields(request))
+
+        if request.query_params.get('stream', '').lower() in ('1', 'true'):
+            return self.stream_rows(rows.order_by('id'))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response([self.to_representation(row) for row in page])
+
+    def stream_rows(self, rows):
+        encoder = JSONEncoder()
+
+        def generate():
+            yield '['
+            for index, row in enumerate(rows.iterator(chunk_size=self.stream_chunk_size)):
+                yield (',' if index else '') + encoder.encode(self.to_representation(row))
+            yield ']'
+
+        return StreamingHttpResponse(generate(), content_type='application/json')
+
+class UserListView(ProjectedUserListMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -169,9 +237,7 @@ class UserListView(APIView):
                 {"error": "Permission denied"},
                 status=status.HTTP_403_FORBIDDEN
             )
-        users = get_user_model().objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        return self.list_users(request, get_user_model().objects.all())
 
 class UserDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -188,7 +254,7 @@ class UserDetailView(APIView):
     def get(self, request, pk):
         """Get user details"""
         if pk == "me":
-            user = request.user
+            user = get_full_user(request)
         else:
             user = self.get_object(pk)
             if not user:
@@ -203,7 +269,7 @@ class UserDetailView(APIView):
     def patch(self, request, pk):
         """Update user details"""
         if pk == "me":
-            user = request.user
+            user = get_full_user(request)
         else:
             user = self.get_object(pk)
             if not user:
@@ -212,10 +278,15 @@ class UserDetailView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
+        claims = token_claims(user)
         serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            data = dict(serializer.data)
+            tokens = update_token_claims(request, user, claims)
+            if tokens:
+                data['tokens'] = tokens
+            return Response(data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
@@ -239,7 +310,9 @@ class UserDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        user_id = user.id
         user.delete()
+        revoke_user(user_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class ChangePasswordView(APIView):
@@ -250,7 +323,7 @@ class ChangePasswordView(APIView):
         Change user password
         """
         if pk == "me":
-            user = request.user
+            user = get_full_user(request)
         else:
             User = get_user_model()
             user = get_object_or_404(User, pk=pk)
@@ -270,13 +343,18 @@ class ChangePasswordView(APIView):
          
             user.set_password(serializer.validated_data['new_password'])
             user.save()
+            # Tokens issued with the old password stop working
+            revoke_user(user.id)
             
-           
             update_session_auth_hash(request, user)
             
-            return Response({
-                'message': 'Password changed successfully'
-            })
+            data = {'message': 'Password changed successfully'}
+            if request.auth is not None and request.user.pk == user.pk:
+                # Keep the caller signed in with a fresh token pair
+                refresh = issue_tokens(user)
+                data['refresh'] = str(refresh)
+                data['access'] = str(refresh.access_token)
+            return Response(data)
 
         return Response(
             serializer.errors,
@@ -340,16 +418,17 @@ class StudentDetailView(APIView):
         student.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class InstructorListView(APIView):
+class InstructorListView(ProjectedUserListMixin, APIView):
     """
     List all instructors or create a new instructor
     """
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        instructors = CustomUser.objects.filter(role=CustomUser.Role.INSTRUCTOR)
-        serializer = UserSerializer(instructors, many=True)
-        return Response(serializer.data)
+        return self.list_users(
+            request,
+            CustomUser.objects.filter(role=CustomUser.Role.INSTRUCTOR)
+        )
     
     def post(self, request):
         serializer = UserSerializer(data=request.data)
@@ -411,28 +490,43 @@ class StudentStatsView(APIView):
         ).distinct().count()
         
 
-        completions = Enrollment.objects.filter(completed=True).count()
-
+        from enrollments.models import Enrollment
+        from courses.models import Course
         from lessons.models import Lesson, LessonCompletion
-        from django.db.models import Count, F, ExpressionWrapper, FloatField
-        
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models import F, FloatField, IntegerField, OuterRef, Subquery
+        from django.db.models.functions import Cast, Coalesce
+
+        completions = Enrollment.objects.filter(status='completed').count()
+
+        # Average progress in one query: per-enrollment lesson totals and
+        # completions come from correlated GROUP BY subqueries, so the
+        # query count no longer grows with the number of enrollments.
+        lessons_per_course = Lesson.objects.filter(
+            module__course=OuterRef('object_id')
+        ).order_by().values('module__course').annotate(
+            count=Count('id')
+        ).values('count')
+
+        completed_per_enrollment = LessonCompletion.objects.filter(
+            student=OuterRef('user'),
+            lesson__module__course=OuterRef('object_id')
+        ).order_by().values('student').annotate(
+            count=Count('id')
+        ).values('count')
+
+        progress = Enrollment.objects.filter(
+            content_type=ContentType.objects.get_for_model(Course)
+        ).annotate(
+            lesson_total=Subquery(lessons_per_course, output_field=IntegerField()),
+            lesson_done=Coalesce(
+                Subquery(completed_per_enrollment, output_field=IntegerField()), 0
+            )
+        ).filter(lesson_total__gt=0).aggregate(
+            avg=Avg(Cast('lesson_done', FloatField()) * 100.0 / F('lesson_total'))
+        )
 
-        enrollments = Enrollment.objects.all()
-        total_progress = 0
-        valid_enrollments = 0
-        
-        for enrollment in enrollments:
-            total_lessons = Lesson.objects.filter(module__course=enrollment.course).count()
-            if total_lessons > 0:
-                completed_lessons = LessonCompletion.objects.filter(
-                    student=enrollment.student,
-                    lesson__module__course=enrollment.course
-                ).count()
-                progress = (completed_lessons / total_lessons) * 100
-                total_progress += progress
-                valid_enrollments += 1
-        
-        avg_progress = round(total_progress / valid_enrollments, 1) if valid_enrollments > 0 else 0
+        avg_progress = round(progress['avg'], 1) if progress['avg'] is not None else 0
         
         stats = {
             'totalStudents': total_students,
@@ -442,3 +536,11 @@ class StudentStatsView(APIView):
         }
         
         return Response(stats)
+
+
+class AuthStatsView(APIView):
+    """Login limiter and password hashing counters, summed across all workers."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'login': login_limiter.stats(), 'password_hashing': hashing_pool.stats()})
@@ -0,0 +1,121 @@
+"""
+Redis channel layer with per-group-prefix tuning.
+
+InMemoryChannelLayer keeps groups inside one process, so a notification sent
+from one ASGI worker never reaches sockets held by another. This layer runs
+on channels_redis instead:
+
+- Groups and channels are sharded across every Redis host in `hosts` by
+  channels_redis' consistent hash of the group or channel name.
+- Group operations are routed by group name prefix to a RedisChannelLayer
+  with its own `capacity`, `channel_capacity`, `expiry` and `group_expiry`.
+  Personal groups (`user_<id>`) and broadcast groups (`course-updates-<id>`,
+  `admin_notifications`) have very different fan-out and lifetime.
+
+All routes share the same hosts, key prefix and serializer, so a message that
+one route pushes to a channel is read by the default layer's `receive()`.
+
+Example:
+
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "datapundits.channel_layers.PrefixRoutedChannelLayer",
+            "CONFIG": {
+                "hosts": ["redis://redis-a:6379/0", "redis://redis-b:6379/0"],
+                "capacity": 100,
+                "group_routes": {
+                    "course-updates-": {"capacity": 1000},
+                    "admin_notifications": {"group_expiry": 3600},
+                },
+            },
+        },
+    }
+"""
+from channels.layers import BaseChannelLayer
+from channels_redis.core import RedisChannelLayer
+
+# Options that must be identical on every route so that routes read and
+# write the same Redis keys with the same encoding
+SHARED_OPTIONS = ('hosts', 'prefix', 'symmetric_encryption_keys', 'serializer_format')
+
+
+class PrefixRoutedChannelLayer(BaseChannelLayer):
+    """
+    Channel layer that picks a RedisChannelLayer per group name prefix.
+
+    Args:
+        group_routes: Mapping of group name prefix to RedisChannelLayer
+                      options that override the defaults for those groups.
+                      The longest matching prefix wins.
+        **config: Default RedisChannelLayer options (hosts, prefix, expiry,
+                  group_expiry, capacity, channel_capacity, ...)
+    """
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, group_routes=None, **config):
+        self.default = RedisChannelLayer(**config)
+        # Expose the defaults the way RedisChannelLayer does
+        self.expiry = self.default.expiry
+        self.capacity = self.default.capacity
+        self.channel_capacity = self.default.channel_capacity
+
+        self.routes = []
+        for group_prefix, overrides in (group_routes or {}).items():
+            invalid = set(overrides) & set(SHARED_OPTIONS)
+            if invalid:
+                raise ValueError(
+                    f"Group route '{group_prefix}' cannot override {sorted(invalid)}"
+                )
+            self.routes.append(
+                (group_prefix, RedisChannelLayer(**{**config, **overrides}))
+            )
+        self.routes.sort(key=lambda route: len(route[0]), reverse=True)
+
+    def layer_for_group(self, group):
+        for group_prefix, layer in self.routes:
+            if group.startswith(group_prefix):
+                return layer
+        return self.default
+
+    @property
+    def layers(self):
+        return [self.default] + [layer for _, layer in self.routes]
+
+    ### Channel API (default layer) ###
+
+    async def send(self, channel, message):
+        await self.default.send(channel, message)
+
+    async def receive(self, channel):
+        return await self.default.receive(channel)
+
+    async def new_channel(self, prefix='specific'):
+        return await self.default.new_channel(prefix)
+
+    ### Groups extension (routed) ###
+
+    async def group_add(self, group, channel):
+        await self.layer_for_group(group).group_add(group, channel)
+
+    async def group_discard(self, group, channel):
+        await self.layer_for_group(group).group_discard(group, channel)
+
+    async def group_send(self, group, message):
+        await self.layer_for_group(group).group_send(group, message)
+
+    ### Flush extension ###
+
+    async def flush(self):
+        # Each layer waits for its own pending work before deleting keys
+        # and closing its pools
+        for layer in self.layers:
+            await layer.flush()
+
+    async def close_pools(self):
+        for layer in self.layers:
+            await layer.close_pools()
+
+    def __str__(self):
+        prefixes = [group_prefix for group_prefix, _ in self.routes]
+        return f'{self.__class__.__name__}(hosts={self.default.hosts}, routes={prefixes})'
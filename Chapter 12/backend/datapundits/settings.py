@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -62,6 +63,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.exceptions.HashingPoolSaturatedMiddleware',
 ]
 
 ROOT_URLCONF = 'datapundits.urls'
@@ -155,8 +157,9 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.StatelessJWTAuthentication',
     ],
+    'EXCEPTION_HANDLER': 'accounts.exceptions.exception_handler',
 }
 
 # Simple JWT Configuration
@@ -172,10 +175,69 @@ AUTHENTICATION_BACKENDS = [
 # Login attempts settings
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_TIME = 300  # 5 minutes in seconds
+MAX_LOGIN_ATTEMPTS_PER_IP = 50  # across all emails, per LOCKOUT_TIME window; None disables
+# Reverse proxies in front of the app; the client IP is read from X-Forwarded-For
+LOGIN_TRUSTED_PROXIES = int(os.environ.get('LOGIN_TRUSTED_PROXIES', 0))
+
+# Password hashing pool (accounts/hashing.py)
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASHING_QUEUE = int(os.environ.get('PASSWORD_HASHING_QUEUE', PASSWORD_HASHING_WORKERS * 4))
+PASSWORD_HASHING_TIMEOUT = 5  # seconds a job may wait before the request is shed
+
+# Email. Set EMAIL_BACKEND to django.core.mail.backends.smtp.EmailBackend in
+# production; the console (or filebased, with EMAIL_FILE_PATH) backend lets
+# the outbox sender run fully offline.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == 'true'
+EMAIL_TIMEOUT = 10
+
+# Email outbox sender (accounts/outbox.py, manage.py send_outbox)
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30  # seconds, doubled per attempt
+OUTBOX_MAX_RETRY_DELAY = 3600
+OUTBOX_CLAIM_TIMEOUT = 300
 
 # Channels Configuration
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+# Set CHANNEL_REDIS_HOSTS (comma separated redis:// URLs) to share groups
+# across ASGI workers; groups are sharded across the hosts. Without it the
+# in-memory layer is used, which only works with a single process.
+CHANNEL_REDIS_HOSTS = [
+    host.strip()
+    for host in os.environ.get('CHANNEL_REDIS_HOSTS', '').split(',')
+    if host.strip()
+]
+
+if CHANNEL_REDIS_HOSTS:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "datapundits.channel_layers.PrefixRoutedChannelLayer",
+            "CONFIG": {
+                "hosts": CHANNEL_REDIS_HOSTS,
+                "prefix": "datapundits",
+                "expiry": 60,
+                "group_expiry": 86400,
+                "capacity": 100,
+                "group_routes": {
+                    # One member each, joined for the lifetime of a socket;
+                    # personal user_<id> groups use the defaults
+                    "dashboard_user_": {"capacity": 50},
+                    # Announcements reach every subscriber in one burst
+                    "course-updates-": {"capacity": 500, "expiry": 120},
+                    # Few members receiving events from every course
+                    "admin_notifications": {"capacity": 1000, "expiry": 120},
+                },
+            },
+        }
     }
-}
\ No newline at end of file
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        }
+    }
\ No newline at end of file
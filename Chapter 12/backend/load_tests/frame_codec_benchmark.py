@@ -0,0 +1,101 @@
+"""
+Micro-benchmark: JSON vs MessagePack websocket frames.
+
+Encodes typical dashboard frames (a full dashboard_update snapshot and a
+small dashboard_patch) with JSON, plain MessagePack and MessagePack with
+interned keys from notifications.codecs, and reports encode time per frame
+and frame size.
+
+Usage (from the backend directory):
+    python load_tests/frame_codec_benchmark.py
+    python load_tests/frame_codec_benchmark.py --number 50000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notifications.codecs import FRAME_KEYS, JSONCodec, MsgpackCodec, msgpack  # noqa: E402
+
+
+def dashboard_update_frame():
+    return {
+        "type": "dashboard_update",
+        "version": 1,
+        "payload": {
+            "enrolled_courses_count": 12,
+            "pending_notifications_count": 4,
+            "pending_notifications": [
+                {
+                    "id": 9000 + i,
+                    "message": f"New lesson published in course {i}",
+                    "created_at": "2026-10-17T09:30:00.000000+00:00"
+                }
+                for i in range(5)
+            ],
+            "recent_enrollments": [
+                {
+                    "course_id": 100 + i,
+                    "course_name": f"Data Engineering Fundamentals {i}",
+                    "status": "active",
+                    "enrolled_date": "2026-10-01T12:00:00.000000+00:00"
+                }
+                for i in range(3)
+            ],
+            "course_completion_stats": {
+                "total_enrolled": 12,
+                "in_progress": 12,
+                "completed": 0
+            },
+            "user_info": {
+                "id": 4242,
+                "username": None,
+                "email": "student@example.com",
+                "is_instructor": False
+            },
+            "timestamp": "2026-10-17T09:30:01.000000+00:00"
+        }
+    }
+
+
+def dashboard_patch_frame():
+    return {
+        "type": "dashboard_patch",
+        "base_version": 1,
+        "version": 2,
+        "ops": [
+            {"op": "replace", "path": "/pending_notifications_count", "value": 5},
+            {"op": "replace", "path": "/timestamp", "value": "2026-10-17T09:31:00.000000+00:00"}
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=20000, help='Encodes per measurement')
+    args = parser.parse_args()
+
+    codecs = [('json', JSONCodec())]
+    if msgpack is not None:
+        codecs.append(('msgpack', MsgpackCodec()))
+        codecs.append(('msgpack+interning', MsgpackCodec(keys=FRAME_KEYS)))
+    else:
+        print('msgpack is not installed; only measuring JSON')
+
+    frames = [
+        ('dashboard_update', dashboard_update_frame()),
+        ('dashboard_patch', dashboard_patch_frame()),
+    ]
+
+    print(f"{'frame':<18} {'codec':<18} {'bytes':>7} {'us/encode':>10}")
+    for frame_name, frame in frames:
+        for codec_name, codec in codecs:
+            size = len(codec.encode(frame))
+            seconds = min(timeit.repeat(lambda: codec.encode(frame), number=args.number, repeat=3))
+            print(f"{frame_name:<18} {codec_name:<18} {size:>7} {seconds / args.number * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: password logins per second per core at different hasher settings.
+
+Each login is one check_password against a stored hash, the work the login
+endpoint does per request. Runs single-threaded (logins/sec per core) and
+through accounts.hashing.HashingPool with --workers threads, and reports
+the cost of the hash upgrade a login triggers when the work factor changes.
+
+Usage (from the backend directory):
+    python load_tests/hashing_benchmark.py
+    python load_tests/hashing_benchmark.py --logins 20 --workers 4
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+settings.configure(
+    PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ],
+    USE_TZ=True,
+)
+django.setup()
+
+from django.contrib.auth.hashers import (  # noqa: E402
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+)
+
+from accounts.hashing import HashingPool  # noqa: E402
+
+PASSWORD = 'TestPass123!'
+
+
+def pbkdf2(iterations):
+    return type(f'PBKDF2{iterations}', (PBKDF2PasswordHasher,), {'iterations': iterations})()
+
+
+def hasher_settings():
+    yield f'pbkdf2_sha256 x{PBKDF2PasswordHasher.iterations} (default)', PBKDF2PasswordHasher()
+    for iterations in (600_000, 260_000, 100_000):
+        yield f'pbkdf2_sha256 x{iterations}', pbkdf2(iterations)
+    yield 'scrypt (default)', ScryptPasswordHasher()
+    if importlib.util.find_spec('bcrypt') is None:
+        print('bcrypt is not installed; skipping bcrypt_sha256')
+    else:
+        yield f'bcrypt_sha256 rounds={BCryptSHA256PasswordHasher.rounds}', BCryptSHA256PasswordHasher()
+
+
+def logins_per_second(encoded, logins, pool=None):
+    started = time.perf_counter()
+    if pool is None:
+        for _ in range(logins):
+            check_password(PASSWORD, encoded)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        # Simulate concurrent request threads all hashing through the pool
+        with ThreadPoolExecutor(max_workers=pool.max_workers + pool.max_queue) as requests:
+            list(requests.map(lambda _: pool.run(check_password, PASSWORD, encoded), range(logins)))
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=10, help='Logins per measurement')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Hashing pool size')
+    args = parser.parse_args()
+
+    pool = HashingPool(max_workers=args.workers, max_queue=args.logins, timeout=600)
+
+    print(f"{'hasher':<32} {'ms/login':>9} {'logins/s/core':>14} {f'pool x{args.workers} logins/s':>20}")
+    for name, hasher in hasher_settings():
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        per_core = logins_per_second(encoded, args.logins)
+        pooled = logins_per_second(encoded, args.logins, pool)
+        print(f"{name:<32} {1000 / per_core:>9.1f} {per_core:>14.1f} {pooled:>20.1f}")
+
+    # A login against an outdated hash pays for verify + the upgraded hash
+    default = PBKDF2PasswordHasher()
+    legacy = pbkdf2(100_000).encode(PASSWORD, default.salt())
+    started = time.perf_counter()
+    check_password(PASSWORD, legacy, setter=lambda raw: default.encode(raw, default.salt()))
+    print(f"\nupgrade login (x100000 -> x{default.iterations}): "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
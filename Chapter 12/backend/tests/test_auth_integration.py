@@ -8,11 +8,14 @@ Tests the complete authentication flow:
 - Token refresh
 - User logout
 """
+import json
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from tests.factories import UserFactory
 
 User = get_user_model()
 
@@ -340,3 +343,67 @@ class TestAuthenticationAPI:
         
 
         assert student_token != instructor_token
+
+
+@pytest.mark.django_db
+class TestUserListAPI:
+    """Test paginated, field-projected user and instructor lists."""
+
+    def test_user_list_is_cursor_paginated(self, admin_client):
+        """Test the user list returns a page with a next cursor."""
+        UserFactory.create_batch(3)
+
+        response = admin_client.get(reverse('user-list'), {'page_size': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is not None
+
+        next_page = admin_client.get(response.data['next'])
+        ids = [row['id'] for row in response.data['results'] + next_page.data['results']]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_user_list_sparse_fields(self, admin_client):
+        """Test fields= limits the returned columns and always keeps id."""
+        response = admin_client.get(reverse('user-list'), {'fields': 'email,name,role'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data['results'][0]) == {'id', 'email', 'name', 'role'}
+
+    def test_user_list_avatar_matches_user_serializer(self, admin_client):
+        """Test projected rows render avatars like UserSerializer."""
+        from accounts.serializers import UserSerializer
+
+        user = UserFactory()
+        User.objects.filter(pk=user.pk).update(avatar='avatars/me.png')
+        user.refresh_from_db()
+
+        response = admin_client.get(reverse('user-list'), {'fields': 'avatar'})
+
+        rows = {row['id']: row for row in response.data['results']}
+        assert rows[user.id]['avatar'] == UserSerializer(user).data['avatar']
+        assert rows[admin_client.user.id]['avatar'] is None
+
+    def test_user_list_unknown_field(self, admin_client):
+        """Test unknown fields are rejected."""
+        response = admin_client.get(reverse('user-list'), {'fields': 'email,password'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_user_list_stream(self, admin_client):
+        """Test stream=true returns every user as one JSON array."""
+        response = admin_client.get(reverse('user-list'), {'stream': 'true', 'fields': 'email'})
+
+        assert response.status_code == status.HTTP_200_OK
+        rows = json.loads(b''.join(response.streaming_content))
+        assert [row['email'] for row in rows] == list(
+            User.objects.order_by('id').values_list('email', flat=True)
+        )
+
+    def test_instructor_list_only_instructors(self, authenticated_client, seed_instructor):
+        """Test the instructor list is paginated and excludes students."""
+        response = authenticated_client.get(reverse('instructor-list'), {'fields': 'email'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['email'] for row in response.data['results']] == [seed_instructor.email]
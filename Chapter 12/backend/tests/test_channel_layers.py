@@ -0,0 +1,126 @@
+"""
+Tests for the prefix-routed Redis channel layer.
+
+Runs against in-process fakeredis servers, one per shard, so group sharding
+and cross-worker delivery are exercised without a Redis installation.
+"""
+import pytest
+from asgiref.sync import async_to_sync
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')  # group_send uses a Lua script
+
+from datapundits.channel_layers import PrefixRoutedChannelLayer
+
+
+@pytest.fixture
+def redis_shards():
+    """Two independent fake Redis servers."""
+    return [fakeredis.FakeServer(), fakeredis.FakeServer()]
+
+
+@pytest.fixture
+def make_layer(redis_shards):
+    """Build layers that share the fake shards, like separate ASGI workers."""
+    def _make_layer(**config):
+        hosts = [
+            {'connection_class': fakeredis.FakeAsyncRedisConnection, 'server': server}
+            for server in redis_shards
+        ]
+        config.setdefault('group_routes', {
+            'user_': {'capacity': 5},
+            'course-updates-': {'capacity': 50, 'group_expiry': 3600},
+        })
+        return PrefixRoutedChannelLayer(hosts=hosts, prefix='test', **config)
+    return _make_layer
+
+
+class TestPrefixRoutedChannelLayer:
+    def test_routes_by_longest_prefix(self, make_layer):
+        layer = make_layer(group_routes={
+            'course-': {'capacity': 10},
+            'course-updates-': {'capacity': 50},
+        })
+
+        assert layer.layer_for_group('course-updates-1').capacity == 50
+        assert layer.layer_for_group('course-1').capacity == 10
+        assert layer.layer_for_group('admin_notifications') is layer.default
+
+    def test_routes_inherit_defaults(self, make_layer):
+        layer = make_layer(expiry=30)
+
+        route = layer.layer_for_group('course-updates-7')
+        assert route.group_expiry == 3600
+        assert route.expiry == 30
+        assert route.hosts == layer.default.hosts
+
+    def test_shared_options_cannot_be_overridden(self, make_layer):
+        with pytest.raises(ValueError):
+            make_layer(group_routes={'user_': {'prefix': 'other'}})
+
+    def test_group_send_reaches_channel_of_another_worker(self, make_layer):
+        sender, receiver = make_layer(), make_layer()
+
+        async def scenario():
+            channel = await receiver.new_channel()
+            await receiver.group_add('course-updates-42', channel)
+            await sender.group_send('course-updates-42', {'type': 'course.update', 'id': 42})
+            message = await receiver.receive(channel)
+            await sender.flush()
+            await receiver.close_pools()
+            return message
+
+        message = async_to_sync(scenario)()
+        assert message == {'type': 'course.update', 'id': 42}
+
+    def test_groups_are_sharded_across_hosts(self, make_layer, redis_shards):
+        layer = make_layer()
+        groups = [f'user_{user_id}' for user_id in range(20)]
+
+        async def scenario():
+            channel = await layer.new_channel()
+            for group in groups:
+                await layer.group_add(group, channel)
+            received = []
+            for group in groups:
+                await layer.group_send(group, {'type': 'notify', 'group': group})
+                received.append(await layer.receive(channel))
+            await layer.flush()
+            return received
+
+        received = async_to_sync(scenario)()
+        assert sorted(message['group'] for message in received) == sorted(groups)
+        shards_used = {layer.default.consistent_hash(group) for group in groups}
+        assert shards_used == set(range(len(redis_shards)))
+
+    def test_route_capacity_drops_overflow(self, make_layer):
+        layer = make_layer()
+
+        async def scenario():
+            channel = await layer.new_channel()
+            await layer.group_add('user_1', channel)
+            for number in range(8):
+                await layer.group_send('user_1', {'type': 'notify', 'number': number})
+            received = [await layer.receive(channel) for _ in range(5)]
+            await layer.flush()
+            return received
+
+        # The user_ route holds at most 5 pending messages per channel
+        received = async_to_sync(scenario)()
+        assert [message['number'] for message in received] == [0, 1, 2, 3, 4]
+
+    def test_group_discard(self, make_layer):
+        layer = make_layer()
+
+        async def scenario():
+            kept = await layer.new_channel()
+            dropped = await layer.new_channel()
+            await layer.group_add('admin_notifications', kept)
+            await layer.group_add('admin_notifications', dropped)
+            await layer.group_discard('admin_notifications', dropped)
+            await layer.group_send('admin_notifications', {'type': 'notify'})
+            message = await layer.receive(kept)
+            await layer.flush()
+            return message
+
+        assert async_to_sync(scenario)() == {'type': 'notify'}